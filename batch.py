@@ -0,0 +1,121 @@
+"""Summarize many sources headlessly from a JSONL file.
+
+Usage: python batch.py jobs.jsonl [-o results.jsonl] [--concurrency 4] [--user teacher1] [--metrics-log metrics.jsonl]
+
+Each input line is a JSON object with either "url" or "pdf" (a file path), and
+optionally "pages" ("1-50"), "role" (teacher/student/kid), "language" (name or
+code from LANGUAGE_MAP) and "user". Results are written as JSONL in completion
+order, saved to the summary history, and a latency/throughput report with
+per-stage p50/p95/p99 is printed to stderr. Per-stage timings are also
+appended to --metrics-log for `python metrics.py`.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import config
+from cache import SummaryCache, ArtifactStore
+from metrics import metrics
+from storage import create_history_store
+from summary_service import summarize_source
+
+def parse_job(line, defaults):
+    """Turn one JSONL record into a summarize_source request"""
+    record = json.loads(line)
+    if "url" in record:
+        request = {"source_type": "url", "source": record["url"]}
+    elif "pdf" in record:
+        request = {"source_type": "pdf", "source": record["pdf"], "name": os.path.basename(record["pdf"]),
+                   "pages": record.get("pages")}
+    else:
+        raise ValueError("each job needs a 'url' or 'pdf' field")
+    language = record.get("language", defaults.lang)
+    request.update(
+        user_key=record.get("user", defaults.user),
+        role=record.get("role", defaults.role),
+        target_lang=config.LANGUAGE_MAP.get(language, language),
+    )
+    return request
+
+def read_jobs(path):
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as f:
+        return [line for line in f if line.strip()]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file with one job per line, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="where to write JSONL results (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=config.BATCH_CONCURRENCY, help="sources summarized at once")
+    parser.add_argument("--user", default="batch", help="history user for jobs without a 'user' field")
+    parser.add_argument("--role", default="student", help="role for jobs without a 'role' field")
+    parser.add_argument("--lang", default="en", help="language for jobs without a 'language' field")
+    parser.add_argument("--api-key", default=os.getenv("GROQ_API_KEY"), help="Groq API key (default: $GROQ_API_KEY)")
+    parser.add_argument("--metrics-log", default=config.METRICS_LOG_PATH or "metrics.jsonl",
+                        help="JSONL file for per-stage timings, '' to disable (default: metrics.jsonl)")
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("a Groq API key is required (--api-key or GROQ_API_KEY)")
+
+    metrics.set_log_path(args.metrics_log)
+    from llm_client import create_llm, PRIORITY_BATCH
+    llm = create_llm(args.api_key, PRIORITY_BATCH)
+    summary_cache, artifact_store, history_store = SummaryCache(), ArtifactStore(), create_history_store()
+
+    lines = read_jobs(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    write_lock = threading.Lock()
+    latencies, failures = [], 0
+
+    def run(index, line):
+        start = time.perf_counter()
+        result = {"index": index}
+        try:
+            request = parse_job(line, args)
+            result["source"] = request["source"]
+            outcome = summarize_source(request, llm, summary_cache, history_store, artifact_store)
+            result.update(status="ok", summary_id=outcome["summary_id"], cached=outcome["cached"],
+                          summary=outcome["summary"])
+        except Exception as e:
+            result.update(status="error", error=str(e))
+        result["latency_seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            futures = [pool.submit(run, i, line) for i, line in enumerate(lines)]
+            for future in as_completed(futures):
+                result = future.result()
+                latencies.append(result["latency_seconds"])
+                failures += result["status"] != "ok"
+                with write_lock:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+                print(f"[{len(latencies)}/{len(lines)}] {result['status']:5} {result['latency_seconds']:7.2f}s "
+                      f"{result.get('source', '')}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    wall = time.perf_counter() - started
+    print(f"\n{len(lines)} jobs, {len(lines) - failures} ok, {failures} failed in {wall:.1f}s "
+          f"({len(lines) / wall * 60 if wall else 0:.1f} jobs/min)", file=sys.stderr)
+    if latencies:
+        print(f"latency p50 {percentile(latencies, 50):.2f}s  p95 {percentile(latencies, 95):.2f}s  "
+              f"max {max(latencies):.2f}s  mean {statistics.mean(latencies):.2f}s", file=sys.stderr)
+        print("\n" + metrics.table(), file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
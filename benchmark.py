@@ -0,0 +1,307 @@
+"""Offline benchmark of the summarization pipeline.
+
+Usage: python benchmark.py [--sizes 2000,20000,100000] [--docs 3] [--latency 0.2] [--json out.json]
+
+Groq, the URL/YouTube loaders and Google Translate are replaced by local
+fakes with configurable latency and output length; everything else (PDF
+extraction, token splitting, map/reduce chains, rate limiting, caches and the
+SQLite history) is the real code. For each document size the corpus holds a
+web page, a YouTube transcript and a generated PDF of about that many tokens,
+summarized through summarize_source. The report lists LLM calls per
+document, wall time, peak memory and throughput; with --baseline the run
+fails if it is slower or makes more calls than a previous --json result.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+WORDS = ("the model summary chapter photosynthesis energy market history river policy student teacher "
+         "experiment result method data network cell theory evidence growth system process value").split()
+
+# --- Fake Groq ---
+class FakeGroqCompletions:
+    """Stands in for groq.Groq().chat.completions: returns dicts shaped like the API's responses.
+
+    Each call sleeps latency + output_tokens * token_latency seconds and
+    answers with output_tokens words derived from the prompt, so identical
+    prompts get identical answers. `responder(prompt)` may return a specific
+    answer instead (e.g. a well-formed quiz), or None for the default.
+    """
+
+    def __init__(self, latency=0.2, token_latency=0.0, output_tokens=150, responder=None):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.output_tokens = output_tokens
+        self.responder = responder
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, messages):
+        from pipeline import count_tokens
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        words = [rng.choice(WORDS) for _ in range(self.output_tokens)]
+        text = "## " + " ".join(words[:4]).title() + "\n" + " ".join(words[4:])
+        if self.responder:
+            text = self.responder(prompt) or text
+        prompt_tokens = count_tokens(prompt)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+        return text, prompt_tokens
+
+    def create(self, messages, stream=False, **params):
+        text, prompt_tokens = self._answer(messages)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": self.output_tokens,
+                 "total_tokens": prompt_tokens + self.output_tokens}
+        if not stream:
+            time.sleep(self.latency + self.output_tokens * self.token_latency)
+            return {"choices": [{"message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                    "usage": usage}
+        return self._stream(text)
+
+    def _stream(self, text):
+        time.sleep(self.latency)
+        pieces = text.split(" ")
+        for i, piece in enumerate(pieces):
+            time.sleep(self.token_latency)
+            yield {"choices": [{"delta": {"role": "assistant", "content": piece + (" " if i < len(pieces) - 1 else "")},
+                                "finish_reason": "stop" if i == len(pieces) - 1 else None}]}
+
+# --- Fake Loaders & Translator ---
+class FakeLoader:
+    """Replaces WebBaseLoader and YoutubeLoader; the corpus maps URLs to synthetic text"""
+
+    corpus = {}
+    latency = 0.0
+
+    def __init__(self, url):
+        self.url = url
+
+    @classmethod
+    def from_youtube_url(cls, url, **kwargs):
+        return cls(url)
+
+    def load(self):
+        from langchain.docstore.document import Document
+        time.sleep(self.latency)
+        return [Document(page_content=self.corpus[self.url], metadata={"source": self.url})]
+
+class FakeTranslator:
+    """Replaces deep_translator.GoogleTranslator and returns the text unchanged after a delay"""
+
+    latency = 0.0
+    calls = 0
+
+    def __init__(self, source="auto", target="en"):
+        self.target = target
+
+    def translate(self, text):
+        time.sleep(self.latency)
+        FakeTranslator.calls += 1
+        return text
+
+    def translate_batch(self, texts):
+        return [self.translate(text) for text in texts]
+
+def install_fakes(args):
+    """Patch the network-bound dependencies; returns the fake Groq client"""
+    import deep_translator
+    import pipeline
+    FakeLoader.latency = args.loader_latency
+    FakeTranslator.latency = args.translate_latency
+    pipeline.WebBaseLoader = FakeLoader
+    pipeline.YoutubeLoader = FakeLoader
+    deep_translator.GoogleTranslator = FakeTranslator
+    return FakeGroqCompletions(args.latency, args.token_latency, args.output_tokens)
+
+# --- Corpus ---
+def synthetic_text(tokens, seed):
+    """Markdown-ish text of roughly `tokens` tokens with headings and paragraphs"""
+    rng = random.Random(seed)
+    parts, words = [], 0
+    while words < tokens * 3 // 4:  # about four tokens for every three words
+        if rng.random() < 0.1:
+            parts.append("\n## " + " ".join(rng.choice(WORDS) for _ in range(3)).title() + "\n")
+        sentence = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+        parts.append(" ".join(sentence).capitalize() + ".")
+        words += len(sentence)
+        if rng.random() < 0.2:
+            parts.append("\n\n")
+    return " ".join(parts)
+
+def synthetic_pdf(path, text):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_font("Arial", size=10)
+    pdf.add_page()
+    pdf.multi_cell(0, 5, text.replace("## ", ""))
+    pdf.output(path)
+
+def build_corpus(sizes, docs_per_size, workdir):
+    """{size: [request, ...]} cycling through web, YouTube and PDF sources"""
+    corpus, seeds = {}, itertools.count()
+    kinds = itertools.cycle(["web", "youtube", "pdf"])
+    for size in sizes:
+        corpus[size] = []
+        for _ in range(docs_per_size):
+            seed, kind = next(seeds), next(kinds)
+            text = synthetic_text(size, seed)
+            if kind == "pdf":
+                path = os.path.join(workdir, f"doc{seed}.pdf")
+                synthetic_pdf(path, text)
+                request = {"source_type": "pdf", "source": path, "name": os.path.basename(path)}
+            else:
+                url = (f"https://www.youtube.com/watch?v=bench{seed}" if kind == "youtube"
+                       else f"https://example.com/bench/{seed}")
+                FakeLoader.corpus[url] = text
+                request = {"source_type": "url", "source": url}
+            corpus[size].append(request)
+    return corpus
+
+# --- Benchmark ---
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="smartsummarizer-bench-")
+    try:
+        return _run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def _run(args, workdir):
+    import llm_client
+    from cache import SummaryCache, ArtifactStore
+    from metrics import metrics
+    from storage import SQLiteHistoryStore
+    from summary_service import summarize_source
+
+    config.RAG_ENABLED = False  # embeddings need a model download; not part of this benchmark
+    metrics.set_log_path("")  # never write a log, even when METRICS_LOG_PATH is set
+    client = install_fakes(args)
+    llm_client.limiter = llm_client.TokenBucketLimiter(args.rpm, args.tpm)
+    llm = llm_client.RateLimitedChatGroq(model=config.GROQ_MODEL, groq_api_key="benchmark", client=client,
+                                         temperature=config.GROQ_TEMPERATURE, max_retries=0)
+    history_store = SQLiteHistoryStore(os.path.join(workdir, "history.db"))
+    artifact_store = ArtifactStore(os.path.join(workdir, "artifacts.db"))
+    print(f"Building corpus in {workdir} ...", file=sys.stderr)
+    corpus = build_corpus(args.sizes, args.docs, workdir)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    results = []
+    for size, requests in corpus.items():
+        # A fresh cache per size so every document is really summarized
+        summary_cache = SummaryCache(os.path.join(workdir, f"cache_{size}.db"))
+        calls_before, translations_before = client.calls, FakeTranslator.calls
+        if args.trace_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+
+        def summarize(request):
+            request = dict(request, user_key="benchmark", role="student", target_lang=args.lang)
+            return summarize_source(request, llm, summary_cache, history_store, artifact_store)
+
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            outcomes = list(pool.map(summarize, requests))
+        wall = time.perf_counter() - started
+        result = {
+            "size_tokens": size,
+            "docs": len(requests),
+            "llm_calls_per_doc": round((client.calls - calls_before) / len(requests), 2),
+            "translate_calls_per_doc": round((FakeTranslator.calls - translations_before) / len(requests), 2),
+            "wall_seconds": round(wall, 3),
+            "docs_per_minute": round(len(requests) / wall * 60, 1),
+            "input_tokens_per_second": round(size * len(requests) / wall),
+            "empty_summaries": sum(not outcome["summary"] for outcome in outcomes),
+        }
+        if args.trace_memory:
+            result["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+        results.append(result)
+        print(f"  {size:>8} tokens: {result['wall_seconds']:.2f}s, {result['llm_calls_per_doc']} calls/doc",
+              file=sys.stderr)
+    return {"settings": {k: v for k, v in vars(args).items() if k not in ("json", "baseline")},
+            "results": results, "peak_rss_mb": _peak_rss_mb()}
+
+def print_report(report):
+    columns = ["size_tokens", "docs", "llm_calls_per_doc", "translate_calls_per_doc", "wall_seconds",
+               "docs_per_minute", "input_tokens_per_second"]
+    if report["settings"]["trace_memory"]:
+        columns.append("peak_traced_mb")
+    print("  ".join(f"{c:>14}" for c in columns))
+    for result in report["results"]:
+        print("  ".join(f"{result[c]:>14}" for c in columns))
+    print(f"\npeak RSS {report['peak_rss_mb']} MB")
+    from metrics import metrics
+    print("\n" + metrics.table())
+
+def regressions(report, baseline, tolerance):
+    """Sizes that got slower or started making more LLM calls than in the baseline"""
+    previous = {r["size_tokens"]: r for r in baseline["results"]}
+    problems = []
+    for result in report["results"]:
+        before = previous.get(result["size_tokens"])
+        if not before:
+            continue
+        if result["llm_calls_per_doc"] > before["llm_calls_per_doc"]:
+            problems.append(f"{result['size_tokens']} tokens: {before['llm_calls_per_doc']} -> "
+                            f"{result['llm_calls_per_doc']} LLM calls per document")
+        if result["wall_seconds"] > before["wall_seconds"] * (1 + tolerance):
+            problems.append(f"{result['size_tokens']} tokens: {before['wall_seconds']}s -> "
+                            f"{result['wall_seconds']}s wall time")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[2000, 20000, 100000],
+                        help="document sizes in tokens, comma-separated")
+    parser.add_argument("--docs", type=int, default=3, help="documents per size (web, YouTube, PDF in turn)")
+    parser.add_argument("--concurrency", type=int, default=config.BATCH_CONCURRENCY, help="documents summarized at once")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake Groq seconds per call")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="fake Groq seconds per output token")
+    parser.add_argument("--output-tokens", type=int, default=150, help="fake Groq tokens per answer")
+    parser.add_argument("--loader-latency", type=float, default=0.0, help="fake URL loader seconds per load")
+    parser.add_argument("--translate-latency", type=float, default=0.0, help="fake translator seconds per call")
+    parser.add_argument("--lang", default="en", help="summary language; anything but en exercises translation")
+    parser.add_argument("--rpm", type=int, default=0, help="requests/min limit to apply (0 = none)")
+    parser.add_argument("--tpm", type=int, default=0, help="tokens/min limit to apply (0 = none)")
+    parser.add_argument("--trace-memory", action="store_true", help="also measure peak Python heap (slower)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed wall-time slowdown vs the baseline")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = regressions(report, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
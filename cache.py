@@ -0,0 +1,141 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+import config
+from metrics import timed
+
+# --- Cache Keys ---
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies of a source hash the same"""
+    return re.sub(r"\s+", " ", text).strip()
+
+def _hash_key(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def summary_cache_key(source_text, role, target_lang, model=None):
+    """Key a summary on the document content and everything that changes its output"""
+    return _hash_key("text", normalize_text(source_text), role or "", target_lang,
+                     model or config.GROQ_MODEL, config.PROMPT_VERSION)
+
+def url_cache_key(url, role, target_lang, model=None):
+    """Key a summary on its URL so repeat requests can skip loading the page"""
+    return _hash_key("url", url.strip(), role or "", target_lang,
+                     model or config.GROQ_MODEL, config.PROMPT_VERSION)
+
+def pdf_digest(source, block_size=1 << 20):
+    """SHA-256 of a PDF given as bytes or a file path; files are hashed in blocks, not read whole"""
+    if not isinstance(source, str):
+        return hashlib.sha256(source).hexdigest()
+    h = hashlib.sha256()
+    with open(source, "rb") as f:
+        while block := f.read(block_size):
+            h.update(block)
+    return h.hexdigest()
+
+def pdf_cache_key(digest, pages, role, target_lang, model=None):
+    """Key a PDF summary on the file's pdf_digest and page range, so pages need not be parsed first"""
+    return _hash_key("pdf", digest, pages.start, pages.stop, role or "",
+                     target_lang, model or config.GROQ_MODEL, config.PROMPT_VERSION)
+
+def documents_text(documents):
+    return "\n".join(doc.page_content for doc in documents)
+
+# --- Summary Cache ---
+class SummaryCache:
+    """Persistent summary cache in SQLite with LRU eviction and optional per-entry TTL"""
+
+    def __init__(self, path=None, max_entries=None):
+        self.max_entries = max_entries or config.SUMMARY_CACHE_MAX_ENTRIES
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or config.SUMMARY_CACHE_PATH, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS summary_cache (
+            key TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            expires_at REAL
+        )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summary_cache_last_used ON summary_cache (last_used)")
+        self._conn.commit()
+
+    @timed("summary_cache_get")
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT summary, expires_at FROM summary_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            summary, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM summary_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE summary_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return summary
+
+    @timed("summary_cache_put")
+    def put(self, key, summary, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (key, summary, created_at, last_used, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, summary, now, now, expires_at))
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM summary_cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        count = self._conn.execute("SELECT COUNT(*) FROM summary_cache").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM summary_cache WHERE key IN (SELECT key FROM summary_cache ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,))
+
+# --- Artifact Store ---
+class ArtifactStore:
+    """Persistent per-summary artifacts: LLM output (mindmap, quiz, slides, audio script) as text, audio as bytes"""
+
+    def __init__(self, path=None):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or config.ARTIFACT_STORE_PATH, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS artifacts (
+            summary_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (summary_id, kind, lang)
+        )""")
+        self._conn.commit()
+
+    @timed("artifact_get")
+    def get(self, summary_id, kind, lang):
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM artifacts WHERE summary_id = ? AND kind = ? AND lang = ?",
+                                     (str(summary_id), kind, lang)).fetchone()
+        return row[0] if row else None
+
+    @timed("artifact_put")
+    def put(self, summary_id, kind, lang, content):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (summary_id, kind, lang, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                (str(summary_id), kind, lang, content, time.time()))
+            self._conn.commit()
+
+    @timed("artifact_delete")
+    def delete(self, summary_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM artifacts WHERE summary_id = ?", (str(summary_id),))
+            self._conn.commit()
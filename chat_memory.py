@@ -0,0 +1,74 @@
+import config
+
+MEMORY_PROMPT = """
+Update the running summary of a conversation about a document.
+
+Current summary:
+{summary}
+
+New conversation turns:
+{turns}
+
+Write the updated summary in at most {words} words. Keep the facts, names and
+numbers the user asked about and any answers they may refer back to.
+"""
+
+def _count_tokens(text):
+    from pipeline import count_tokens
+    return count_tokens(text)
+
+def truncate_tokens(text, max_tokens, keep_end=False):
+    """Cut text to roughly max_tokens, keeping the start (or the end)"""
+    tokens = _count_tokens(text)
+    while tokens > max_tokens:
+        keep = max(1, len(text) * max_tokens // tokens - 1)
+        text = text[-keep:] if keep_end else text[:keep]
+        tokens = _count_tokens(text)
+    return text
+
+def _format_turns(turns):
+    return "\n".join(f"{'User' if role == 'user' else 'Assistant'}: {content}" for role, content in turns)
+
+# --- Chat Memory ---
+class ChatMemory:
+    """Recent turns kept verbatim plus a rolling summary of older ones, under a fixed token budget"""
+
+    def __init__(self, max_tokens=None, summary_tokens=None):
+        self.max_tokens = max_tokens or config.CHAT_MEMORY_TOKENS
+        self.summary_tokens = summary_tokens or config.CHAT_MEMORY_SUMMARY_TOKENS
+        self.summary = ""
+        self.recent = []  # (role, content), oldest first
+
+    def add(self, role, content):
+        self.recent.append((role, content))
+
+    def _recent_budget(self):
+        return self.max_tokens - self.summary_tokens
+
+    def compact(self, llm):
+        """Fold the oldest turns into the summary until the recent ones fit; one LLM call at most"""
+        overflow = []
+        while len(self.recent) > 2 and _count_tokens(_format_turns(self.recent)) > self._recent_budget():
+            overflow.extend(self.recent[:2])  # a question and its answer
+            del self.recent[:2]
+        if not overflow:
+            return
+        prompt = MEMORY_PROMPT.format(summary=self.summary or "(none yet)", turns=_format_turns(overflow),
+                                      words=self.summary_tokens * 3 // 4)
+        try:
+            response = llm.invoke(prompt)
+            summary = response.content if hasattr(response, 'content') else str(response)
+        except Exception:
+            # Keep the old summary; the dropped turns are lost but the prompt stays bounded
+            return
+        self.summary = truncate_tokens(summary.strip(), self.summary_tokens)
+
+    def render(self):
+        """Conversation so far for the prompt, never longer than max_tokens"""
+        parts = []
+        if self.summary:
+            parts.append(f"Earlier conversation (summarized): {self.summary}")
+        if self.recent:
+            # A single very long turn can still exceed the budget on its own
+            parts.append(truncate_tokens(_format_turns(self.recent), self._recent_budget(), keep_end=True))
+        return "\n".join(parts)
@@ -0,0 +1,136 @@
+import os
+
+# --- Model ---
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+GROQ_TEMPERATURE = float(os.getenv("GROQ_TEMPERATURE", "0.3"))
+
+# --- Groq Rate Limits (shared by every call in the process; 0 disables a limit) ---
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "30000"))
+# Output tokens assumed per call until the response reports real usage
+GROQ_OUTPUT_TOKENS_ESTIMATE = int(os.getenv("GROQ_OUTPUT_TOKENS_ESTIMATE", "500"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+GROQ_BACKOFF_SECONDS = float(os.getenv("GROQ_BACKOFF_SECONDS", "2"))
+GROQ_MAX_BACKOFF_SECONDS = float(os.getenv("GROQ_MAX_BACKOFF_SECONDS", "60"))
+
+# --- Request Deduplication ---
+# Identical concurrent Groq requests share one call. Set a directory to also share
+# calls between processes (e.g. several app workers and the batch CLI on one host)
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") == "1"
+SINGLE_FLIGHT_DIR = os.getenv("SINGLE_FLIGHT_DIR", "")
+# How long a finished cross-process result is served to processes that were waiting for it
+SINGLE_FLIGHT_RESULT_TTL = int(os.getenv("SINGLE_FLIGHT_RESULT_TTL", "30"))
+
+# --- Summarization ---
+# Max number of chunk summaries requested from Groq at the same time
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+# Chunks are measured in tokens; 0 sizes them to the model context (see MAP_* budgets)
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "0"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "100"))
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+# Stream chunk summaries token by token and show the draft while a job runs;
+# 0 makes one non-streaming call per chunk and hides the draft
+STREAM_SUMMARIES = os.getenv("STREAM_SUMMARIES", "1") == "1"
+# Bump when a prompt changes so cached summaries from the old prompt are not reused
+PROMPT_VERSION = os.getenv("PROMPT_VERSION", "1")
+
+# --- Summary Cache ---
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "summary_cache.db")
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+# Web pages and video transcripts can change, so URL entries expire (seconds)
+URL_CACHE_TTL = int(os.getenv("URL_CACHE_TTL", str(24 * 60 * 60)))
+
+# --- Artifact Store (mindmap, quiz, slides, audio per summary) ---
+ARTIFACT_STORE_PATH = os.getenv("ARTIFACT_STORE_PATH", "artifacts.db")
+
+# --- Languages & UI Translation ---
+LANGUAGE_MAP = {"English": "en", "Hindi": "hi", "Telugu": "te", "Tamil": "ta", "Kannada": "kn", "French": "fr", "Spanish": "es", "German": "de"}
+# Rebuild with `python translation.py` after adding new UI labels
+TRANSLATION_CATALOG_PATH = os.getenv("TRANSLATION_CATALOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui_translations.json"))
+TRANSLATION_SOURCES = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "final.py")]
+# Google Translate rejects requests over 5000 characters
+TRANSLATION_MAX_CHARS = int(os.getenv("TRANSLATION_MAX_CHARS", "4500"))
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+
+# --- Summary History Storage ---
+# "mysql" or "sqlite"
+HISTORY_BACKEND = os.getenv("HISTORY_BACKEND", "mysql")
+MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
+MYSQL_USER = os.getenv("MYSQL_USER", "root")
+MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "1234")
+MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "user_summary_history")
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+# Seconds a history query waits for a free pooled connection before failing
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "30"))
+SQLITE_HISTORY_PATH = os.getenv("SQLITE_HISTORY_PATH", "summaries.db")
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "10"))
+
+# --- Startup ---
+# Max import time (seconds) of the modules loaded before the login page renders
+STARTUP_IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", "1.0"))
+
+# --- PDF Ingestion ---
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Smaller PDFs are parsed in-process; a process pool only pays off for long documents
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+# "spawn" is safe inside Streamlit's multi-threaded server; "fork" starts faster
+PDF_MP_START_METHOD = os.getenv("PDF_MP_START_METHOD", "spawn")
+
+# --- Context Budget ---
+MODEL_CONTEXT_TOKENS = int(os.getenv("MODEL_CONTEXT_TOKENS", "8192"))
+MAP_PROMPT_TOKENS = int(os.getenv("MAP_PROMPT_TOKENS", "200"))
+MAP_OUTPUT_TOKENS = int(os.getenv("MAP_OUTPUT_TOKENS", "1500"))
+REDUCE_PROMPT_TOKENS = int(os.getenv("REDUCE_PROMPT_TOKENS", "200"))
+REDUCE_OUTPUT_TOKENS = int(os.getenv("REDUCE_OUTPUT_TOKENS", "1500"))
+# Reduce long documents in a tree of context-sized groups instead of one overflowing call
+HIERARCHICAL_SUMMARY = os.getenv("HIERARCHICAL_SUMMARY", "1") == "1"
+
+# --- Background Jobs ---
+# Summaries run on a per-node worker pool so they survive Streamlit reruns
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "4"))
+MAX_JOBS_PER_USER = int(os.getenv("MAX_JOBS_PER_USER", "2"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.5"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# --- Retrieval-Augmented Chat ---
+RAG_ENABLED = os.getenv("RAG_ENABLED", "1") == "1"
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", "vector_indexes")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# all-MiniLM-L6-v2 truncates input at 256 word pieces
+RAG_CHUNK_TOKENS = int(os.getenv("RAG_CHUNK_TOKENS", "200"))
+RAG_CHUNK_OVERLAP_TOKENS = int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", "30"))
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+# Tokens of the summary kept as an overview in chat prompts that have excerpts
+RAG_SUMMARY_TOKENS = int(os.getenv("RAG_SUMMARY_TOKENS", "150"))
+
+# --- Chat Memory ---
+# Token budget for conversation history in each chat prompt, of which the rolling summary gets up to
+CHAT_MEMORY_TOKENS = int(os.getenv("CHAT_MEMORY_TOKENS", "1200"))
+CHAT_MEMORY_SUMMARY_TOKENS = int(os.getenv("CHAT_MEMORY_SUMMARY_TOKENS", "300"))
+
+# --- Metrics ---
+# Per-stage timings are appended here as JSONL; off by default because the app
+# would log every rerun without bound (batch.py enables it with --metrics-log)
+METRICS_LOG_PATH = os.getenv("METRICS_LOG_PATH", "")
+# Prometheus-style /metrics endpoint, local only by default (0 disables it)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+# Recent samples per stage used for the p50/p95/p99 quantiles
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1000"))
+
+# --- Audio Summaries ---
+# "gtts" (Google, needs network) or "espeak" (local espeak-ng binary, works offline)
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts")
+# gTTS accent domain ("com", "co.uk", "co.in") or espeak voice ("en+f3"); blank for the default
+TTS_VOICE = os.getenv("TTS_VOICE", "")
+# Scripts are synthesized in sentence-aligned chunks of about this many characters, in parallel
+TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "300"))
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+
+# --- Slides ---
+# A .pptx whose first two layouts are "Title" and "Title and Content"; blank uses the built-in theme
+SLIDE_TEMPLATE_PATH = os.getenv("SLIDE_TEMPLATE_PATH", "")
+# Decks built at once when exporting many summaries
+SLIDE_WORKERS = int(os.getenv("SLIDE_WORKERS", "2"))
@@ -1,22 +1,21 @@
 import streamlit as st
 import validators
-import os
-import base64
-from fpdf import FPDF
-from langchain.prompts import PromptTemplate
-from langchain.chains.summarize import load_summarize_chain
-from langchain.document_loaders import PyPDFLoader, YoutubeLoader, WebBaseLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_groq import ChatGroq
-from deep_translator import GoogleTranslator
-import mysql.connector
 import sqlite3
 import re
-import graphviz
 import math
-from gtts import gTTS  
-from pptx import Presentation  
-import tempfile 
+import json
+
+# Heavy dependencies (langchain, groq, fpdf, graphviz, gtts, pptx) are imported
+# inside the functions that use them so the role and login pages start fast.
+# Run `python startup_report.py` to measure the import cost of each module.
+import config
+from cache import SummaryCache, ArtifactStore
+from translation import translate_text
+from storage import create_history_store
+from jobs import JobManager
+from summary_service import summarize_source
+from metrics import timed
+import slides
 
 # --- SQLite for Login/Register ---
 conn_sqlite = sqlite3.connect("users.db", check_same_thread=False)
@@ -46,164 +45,71 @@ def verify_user(username, password):
     cursor_sqlite.execute("SELECT * FROM users WHERE username = ? AND password = ?", (username, password))
     return cursor_sqlite.fetchone() is not None
 
-# --- MySQL for summary history ---
+# --- Metrics endpoint (http://127.0.0.1:9464/metrics by default) ---
+@st.cache_resource
+def start_metrics_server():
+    import metrics
+    return metrics.serve()
+
+start_metrics_server()
+
+# --- Summary cache shared by all sessions ---
+@st.cache_resource
+def get_summary_cache():
+    return SummaryCache()
+
+summary_cache = get_summary_cache()
+
+@st.cache_resource
+def get_artifact_store():
+    return ArtifactStore()
+
+artifact_store = get_artifact_store()
+
+def generate_artifact_text(llm, prompt, summary_id=None, kind=None, regenerate=False):
+    """Return the stored LLM output for a summary artifact, calling the LLM only when missing or asked to regenerate"""
+    lang = st.session_state.get("target_lang") or "en"
+    if summary_id is not None and not regenerate:
+        content = artifact_store.get(summary_id, kind, lang)
+        if content is not None:
+            return content
+    response = llm.invoke(prompt)
+    content = response.content if hasattr(response, 'content') else str(response)
+    if summary_id is not None:
+        artifact_store.put(summary_id, kind, lang, content)
+    return content
+
+# --- Summary history (MySQL or SQLite, see HISTORY_BACKEND) ---
+@st.cache_resource
+def get_history_store():
+    return create_history_store()
+
 def save_summary(user_key, source_type, source_value, summary):
-    conn = mysql.connector.connect(host="localhost", user="root", password="1234", database="user_summary_history")
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO summaries (user_key, source_type, source_value, summary) VALUES (%s, %s, %s, %s)",
-                   (user_key, source_type, source_value, summary))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-def get_summary_history(user_key):
-    conn = mysql.connector.connect(host="localhost", user="root", password="1234", database="user_summary_history")
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, source_type, source_value, summary, timestamp FROM summaries WHERE user_key = %s ORDER BY timestamp DESC", (user_key,))
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return rows
+    return get_history_store().save(user_key, source_type, source_value, summary)
+
+def get_summary_history(user_key, limit, before=None):
+    return get_history_store().history_page(user_key, limit, before)
+
+def search_summary_history(user_key, query, limit):
+    return get_history_store().search(user_key, query, limit)
+
+def get_summary_text(summary_id):
+    """Fetch a summary body once per session, only when its history item is opened"""
+    key = f"summary_body_{summary_id}"
+    if key not in st.session_state:
+        st.session_state[key] = get_history_store().get(summary_id) or ""
+    return st.session_state[key]
 
 def delete_summary(summary_id):
-    conn = mysql.connector.connect(host="localhost", user="root", password="1234", database="user_summary_history")
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM summaries WHERE id = %s", (summary_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-def generate_presentation(summary_text, llm):
-    """Convert summary to a colorful, attractive PowerPoint with 6-7 slides"""
-    try:
-        # Generate structured content from the summary
-        prompt = f"""Transform this content into a professional PowerPoint presentation with 6-7 slides:
-        {summary_text}
-        
-        Rules:
-        1. Create 6-7 slides covering key aspects
-        2. Don't copy exact text - rephrase for presentation
-        3. Include:
-           - Title slide with topic
-           - Introduction/Overview
-           - 3-4 key points (1 slide each)
-           - Case study/example (if applicable)
-           - Conclusion slide
-        4. For each slide provide:
-           - Slide title
-           - 3-5 concise bullet points
-           - Suggested visual theme (chart/diagram/image)
-        
-        Format exactly like this:
-        Slide 1: [Title] | [Theme]
-        - Content point 1
-        - Content point 2
-        
-        Slide 2: [Title] | [Theme]
-        - Content point 1
-        - Content point 2"""
-        
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        
-        # Create presentation
-        prs = Presentation()
-        
-        # Slide layouts
-        title_slide_layout = prs.slide_layouts[0]
-        section_header_layout = prs.slide_layouts[1]
-        content_layout = prs.slide_layouts[5]  # Blank layout for custom designs
-        
-        # Color scheme
-        colors = {
-            'title_bg': (0, 32, 96),        # Dark blue
-            'content_bg': (227, 239, 255),  # Light blue
-            'accent1': (255, 102, 0),       # Orange
-            'accent2': (0, 176, 80)         # Green
-        }
-        
-        # Parse content and create slides
-        current_slide = None
-        for line in content.split('\n'):
-            line = line.strip()
-            if line.startswith('Slide'):
-                # Add previous slide if exists
-                if current_slide:
-                    prs.slides.add_slide(current_slide)
-                
-                # Create new slide
-                parts = line.split('|')
-                title = parts[0].split(':')[1].strip()
-                theme = parts[1].strip() if len(parts) > 1 else "Default"
-                
-                if "Title" in line:
-                    current_slide = prs.slides.add_slide(title_slide_layout)
-                    background = current_slide.background
-                    fill = background.fill
-                    fill.solid()
-                    fill.fore_color.rgb = colors['title_bg']
-                    
-                    title_shape = current_slide.shapes.title
-                    title_shape.text = title
-                    title_shape.text_frame.paragraphs[0].font.color.rgb = (255, 255, 255)  # White text
-                    
-                    subtitle = current_slide.placeholders[1]
-                    subtitle.text = "AI-Generated Presentation"
-                else:
-                    current_slide = prs.slides.add_slide(content_layout)
-                    
-                    # Add title
-                    title_box = current_slide.shapes.add_textbox(left=0.5*914400, top=0.2*914400, 
-                                                              width=6*914400, height=914400)
-                    tf = title_box.text_frame
-                    p = tf.add_paragraph()
-                    p.text = title
-                    p.font.size = 32
-                    p.font.color.rgb = colors['title_bg']
-                    p.font.bold = True
-                    
-                    # Add theme indicator
-                    theme_box = current_slide.shapes.add_textbox(left=7*914400, top=7*914400,
-                                                               width=2*914400, height=0.5*914400)
-                    tf = theme_box.text_frame
-                    p = tf.add_paragraph()
-                    p.text = f"Theme: {theme}"
-                    p.font.size = 12
-                    p.font.color.rgb = (100, 100, 100)
-                    
-            elif line.startswith('-'):
-                if current_slide and not isinstance(current_slide, int):
-                    # Add content to current slide
-                    left = 1*914400
-                    top = 1.5*914400 + (len(current_slide.shapes.placeholders)*0.5*914400)
-                    
-                    content_box = current_slide.shapes.add_textbox(left=left, top=top,
-                                                                 width=7*914400, height=0.8*914400)
-                    tf = content_box.text_frame
-                    p = tf.add_paragraph()
-                    p.text = "• " + line[1:].strip()
-                    p.font.size = 24
-                    p.font.color.rgb = (0, 0, 0)
-                    p.space_after = 0
-        
-        # Add final slide if exists
-        if current_slide and not isinstance(current_slide, int):
-            prs.slides.add_slide(current_slide)
-        
-        # Add conclusion slide
-        conclusion = prs.slides.add_slide(section_header_layout)
-        conclusion.shapes.title.text = "Key Takeaways"
-        conclusion.placeholders[1].text = "1. First key point\n2. Second key point\n3. Third key point"
-        
-        # Save to temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pptx")
-        prs.save(temp_file.name)
-        return temp_file.name
-        
-    except Exception as e:
-        st.error(f"PPT Generation Error: {str(e)}")
-        return None
-def generate_quiz(summary_text, llm):
+    get_history_store().delete(summary_id)
+
+def describe_llm_error(e):
+    """Error text for the page; rate limits that outlast the retries get a friendlier message"""
+    if getattr(e, "status_code", None) == 429:
+        return "Groq is busy right now (rate limit reached). Please try again in a minute."
+    return str(e)
+
+def generate_quiz(summary_text, llm, summary_id=None, regenerate=False):
     """Generate and administer an interactive quiz from text with enhanced feedback"""
     try:
         prompt = f"""
@@ -225,8 +131,7 @@ def generate_quiz(summary_text, llm):
         3. Questions should cover different aspects of the content
         4. Include clear explanations for correct answers
         """
-        response = llm.invoke(prompt)
-        quiz_content = response.content if hasattr(response, 'content') else str(response)
+        quiz_content = generate_artifact_text(llm, prompt, summary_id, "quiz", regenerate)
         
         # Parse the quiz questions
         questions = []
@@ -359,14 +264,27 @@ def generate_quiz(summary_text, llm):
         return None
         
     except Exception as e:
-        st.error(f"Quiz generation failed: {str(e)}")
+        st.error(f"Quiz generation failed: {describe_llm_error(e)}")
         return None
 
-def generate_audiobook(summary_text, llm):
-    """Generate a fresh 2-minute audio gist of the topic"""
+def generate_audiobook(summary_text, llm, summary_id=None, regenerate=False):
+    """Generate a fresh 2-minute audio gist of the topic; returns (audio bytes, mime type)
+
+    The audio is stored per summary, language and voice, so replays are read
+    back instead of synthesized again.
+    """
+    import tts
+    lang = st.session_state.get("target_lang") or "en"
     try:
+        backend = tts.create_tts_backend()
+        kind = f"audio_{backend.name}_{config.TTS_VOICE or 'default'}"
+        if summary_id is not None and not regenerate:
+            audio = artifact_store.get(summary_id, kind, lang)
+            if audio is not None:
+                return audio, backend.mime
+        language_name = next((name for name, code in language_map.items() if code == lang), "English")
         # Generate a fresh, engaging audio script
-        prompt = f"""Create a concise 2-minute (150-200 word) audio script about this topic:
+        prompt = f"""Create a concise 2-minute (150-200 word) audio script about this topic, written in {language_name}:
         {summary_text}
         
         Rules:
@@ -385,46 +303,25 @@ def generate_audiobook(summary_text, llm):
         The key thing to understand is... What makes this important is...
         You can apply this by..." """
         
-        response = llm.invoke(prompt)
-        script = response.content if hasattr(response, 'content') else str(response)
+        script = generate_artifact_text(llm, prompt, summary_id, "audio_script", regenerate)
         
         # Further limit to ~200 words (approximately 1.5-2 minutes)
         words = script.split()[:200]
         final_script = ' '.join(words)
         
-        # Convert to speech with natural pacing
-        tts = gTTS(
-            text=final_script,
-            lang='en',
-            slow=False,
-            lang_check=False
-        )
-        
-        # Save to temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        tts.save(temp_file.name)
-        return temp_file.name
+        # Sentence chunks are synthesized in parallel and joined
+        audio, mime = tts.synthesize(final_script, lang, config.TTS_VOICE or None, backend)
+        if summary_id is not None:
+            artifact_store.put(summary_id, kind, lang, audio)
+        return audio, mime
         
     except Exception as e:
-        st.error(f"Audio generation error: {str(e)}")
+        st.error(f"Audio generation error: {describe_llm_error(e)}")
         return None
-# --- Text Cleaning Utilities ---
-def clean_text(text):
-    """Clean text of problematic unicode characters"""
-    replacements = {
-        '\u2013': '-',  # en dash
-        '\u2014': '-',  # em dash
-        '\u2018': "'",  # left single quote
-        '\u2019': "'",  # right single quote
-        '\u201c': '"',  # left double quote
-        '\u201d': '"',  # right double quote
-    }
-    for k, v in replacements.items():
-        text = text.replace(k, v)
-    return text
-
 # --- Download Utilities ---
+@timed("generate_pdf")
 def generate_pdf(summary_text):
+    from fpdf import FPDF
     pdf = FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -437,25 +334,18 @@ def generate_pdf(summary_text):
     
     for line in clean_text.split('\n'):
         pdf.multi_cell(0, 10, line)
-    pdf_path = "summary.pdf"
-    pdf.output(pdf_path)
-    return pdf_path
-
-def get_download_link(file_path, label, file_type):
-    with open(file_path, "rb") as f:
-        bytes_data = f.read()
-    b64 = base64.b64encode(bytes_data).decode()
-    href = f'<a href="data:application/{file_type};base64,{b64}" download="{os.path.basename(file_path)}">{label}</a>'
-    return href
-
-# --- Translation ---
-def translate_text(text, target_lang):
-    if target_lang == "en":
-        return text
-    try:
-        return GoogleTranslator(source='auto', target=target_lang).translate(text)
-    except:
-        return text
+    # Render in memory; fpdf returns a latin-1 str, fpdf2 a bytearray
+    data = pdf.output(dest='S')
+    return data.encode('latin-1') if isinstance(data, str) else bytes(data)
+
+def show_download_buttons(summary_text, key):
+    """Offer the summary as TXT and PDF; the files are built only when a button is clicked"""
+    st.download_button("📄 " + translate_text("Download TXT", target_lang),
+                       data=lambda: summary_text.encode("utf-8"),
+                       file_name="summary.txt", mime="text/plain", key=f"download_txt_{key}", on_click="ignore")
+    st.download_button("📝 " + translate_text("Download PDF", target_lang),
+                       data=lambda: generate_pdf(summary_text),
+                       file_name="summary.pdf", mime="application/pdf", key=f"download_pdf_{key}", on_click="ignore")
 
 # --- Password Validation ---
 def is_valid_password(password):
@@ -470,11 +360,12 @@ def is_valid_password(password):
     return True
 
 # --- Mindmap Generation ---
-def generate_mindmap(summary_text, llm):
+def generate_mindmap(summary_text, llm, summary_id=None, regenerate=False):
     """
     Generate a visual mindmap diagram with radial layout similar to the example image
     Returns graphviz Digraph object and text structure
     """
+    import graphviz
     try:
         # Enhanced prompt for better visual structure
         prompt = f"""Convert this content into a radial mindmap structure:
@@ -495,8 +386,7 @@ def generate_mindmap(summary_text, llm):
         4. Create 4-6 main branches
         5. Keep sub-branches concise"""
         
-        response = llm.invoke(prompt)
-        structure = response.content if hasattr(response, 'content') else str(response)
+        structure = generate_artifact_text(llm, prompt, summary_id, "mindmap", regenerate)
         
         # Create radial graph
         graph = graphviz.Digraph(
@@ -589,13 +479,31 @@ def generate_mindmap(summary_text, llm):
         return graph, structure
         
     except Exception as e:
-        st.error(f"Mindmap generation error: {str(e)}")
+        st.error(f"Mindmap generation error: {describe_llm_error(e)}")
         return None, None
 # --- Chatbot for Summary ---
+def retrieve_excerpts(summary_id, question):
+    """Source passages relevant to question, or [] when the summary has no chat index"""
+    if not config.RAG_ENABLED:
+        return []
+    index_key = artifact_store.get(summary_id, "rag_index", "")
+    if not index_key:
+        return []
+    try:
+        import rag
+        return rag.retrieve(index_key, question)
+    except Exception:
+        return []  # missing index files or embedder; answer from the summary
+
 def summary_chatbot(summary_text, summary_id, llm):
     # Initialize chat history if not exists
     if f"chat_history_{summary_id}" not in st.session_state:
         st.session_state[f"chat_history_{summary_id}"] = []
+    # What the model sees of the conversation, bounded regardless of its length
+    if f"chat_memory_{summary_id}" not in st.session_state:
+        from chat_memory import ChatMemory
+        st.session_state[f"chat_memory_{summary_id}"] = ChatMemory()
+    memory = st.session_state[f"chat_memory_{summary_id}"]
     
     # Display chat interface outside the expander
     st.markdown("---")
@@ -617,10 +525,36 @@ def summary_chatbot(summary_text, summary_id, llm):
         
         try:
             # Generate assistant response
-            context = f"""
+            excerpts = retrieve_excerpts(summary_id, prompt)
+            conversation = memory.render() or "(this is the first question)"
+            if excerpts:
+                # The excerpts carry the detail, so only the opening of the summary is kept as an overview
+                from chat_memory import truncate_tokens
+                overview = truncate_tokens(summary_text, config.RAG_SUMMARY_TOKENS)
+                sources = "\n\n".join(f"[{i}] {text}" for i, text in enumerate(excerpts, 1))
+                context = f"""
+            Overview of the document:
+            {overview}
+            
+            Excerpts from the original document:
+            {sources}
+            
+            Conversation so far:
+            {conversation}
+            
+            User Question: {prompt}
+            
+            Answer the question based only on the overview and excerpts above.
+            If you can't answer, say 'This information is not in the document'.
+            """
+            else:
+                context = f"""
             Summary Context:
             {summary_text}
             
+            Conversation so far:
+            {conversation}
+            
             User Question: {prompt}
             
             Answer the question based only on the summary above.
@@ -632,13 +566,16 @@ def summary_chatbot(summary_text, summary_id, llm):
             
             # Add assistant response to chat history
             st.session_state[f"chat_history_{summary_id}"].append({"role": "assistant", "content": answer})
+            memory.add("user", prompt)
+            memory.add("assistant", answer)
             
             # Display assistant response
             with st.chat_message("assistant"):
                 st.write(answer)
+            memory.compact(llm)
                 
         except Exception as e:
-            st.error(f"Error generating response: {str(e)}")
+            st.error(f"Error generating response: {describe_llm_error(e)}")
 
 # --- Streamlit Page Config ---
 st.set_page_config(page_title="Smart Summarizer App", layout="centered")
@@ -648,7 +585,7 @@ for key in ["logged_in", "username", "page", "target_lang", "active_chat", "role
     if key not in st.session_state:
         st.session_state[key] = "" if key == "username" else False if key == "logged_in" else "role_select" if key == "page" else "en" if key == "target_lang" else None
 # --- Language Map & Selector ---
-language_map = {"English": "en", "Hindi": "hi", "Telugu": "te", "Tamil": "ta", "Kannada": "kn", "French": "fr", "Spanish": "es", "German": "de"}
+language_map = config.LANGUAGE_MAP
 selected_language = st.sidebar.selectbox("🌐 Select Language", list(language_map.keys()), index=0)
 st.session_state.target_lang = language_map[selected_language]
 target_lang = st.session_state.target_lang
@@ -772,14 +709,108 @@ def get_role_prompt(role):
     }
     return role_instructions.get(role, "")
 
-prompt_template = PromptTemplate.from_template(f"""
-You are a helpful assistant summarizing content for a {st.session_state.role}. 
-{get_role_prompt(st.session_state.role)}
+def show_section_summaries(summary_id):
+    levels = artifact_store.get(summary_id, "summary_levels", "en")
+    if levels and st.checkbox("📑 " + translate_text("Show section summaries", target_lang), key=f"sections_{summary_id}"):
+        sections = json.loads(levels)[-2]
+        for i, section in enumerate(sections, 1):
+            st.markdown(f"**{translate_text('Section', target_lang)} {i}**")
+            st.markdown(section)
+
+# --- Background Summary Jobs ---
+@st.cache_resource
+def get_job_manager():
+    # Failed summaries show the same friendly rate-limit message as on-click features
+    return JobManager(describe_error=describe_llm_error)
+
+def submit_summary_job(llm, request, description):
+    """Run a summary on the node's job pool so it keeps going across reruns"""
+    request = dict(request, user_key=st.session_state.username, role=st.session_state.role, target_lang=target_lang)
+    try:
+        from llm_client import PRIORITY_BACKGROUND
+        # Chat and other on-click requests go ahead of queued summary chunks
+        get_job_manager().submit(st.session_state.username, description, summarize_source,
+                                 request, llm.with_priority(PRIORITY_BACKGROUND), summary_cache, get_history_store(), artifact_store)
+    except RuntimeError as e:
+        st.warning(translate_text(str(e), target_lang))
+
+# --- Slide Decks (built on the job pool, see slides.py) ---
+def deck_job(llm, summary_id, summary_text, lang, file_name, regenerate=False, progress=None):
+    deck = slides.deck_for_summary(llm, artifact_store, summary_id, summary_text, lang, regenerate, progress)
+    return {"download": {"label": "📊 Download Slides", "data": deck, "file_name": file_name, "mime": slides.PPTX_MIME}}
+
+def export_decks_job(llm, history_store, items, lang, progress=None):
+    archive = slides.export_decks(llm, artifact_store, history_store, items, lang, progress)
+    return {"download": {"label": "🗂️ Download All Slides (ZIP)", "data": archive,
+                          "file_name": "summary_slides.zip", "mime": "application/zip"}}
+
+def submit_download_job(llm, description, fn, *args):
+    """Build a file on the job pool; the job panel offers it for download when done"""
+    from llm_client import PRIORITY_BACKGROUND
+    try:
+        get_job_manager().submit(st.session_state.username, description, fn, llm.with_priority(PRIORITY_BACKGROUND), *args)
+    except RuntimeError as e:
+        st.warning(translate_text(str(e), target_lang))
+
+def show_slides(summary_id, summary_text, source_value, llm):
+    """A stored deck downloads straight away; otherwise it is built in the background"""
+    file_name = slides.deck_file_name(source_value, summary_id)
+    deck = artifact_store.get(summary_id, "deck", target_lang)
+    if deck is not None:
+        st.download_button("📊 " + translate_text("Download Slides", target_lang), data=deck, file_name=file_name,
+                           mime=slides.PPTX_MIME, key=f"download_pptx_{summary_id}", on_click="ignore")
+    label = "🔄 Rebuild Slides" if deck is not None else "📊 Build Slides"
+    if st.button(translate_text(label, target_lang), key=f"slides_{summary_id}"):
+        submit_download_job(llm, f"📊 {source_value}", deck_job, summary_id, summary_text, target_lang, file_name, deck is not None)
+        st.rerun()
 
-Content: {{text}}
+def all_history_items(user_key):
+    """Every history entry of the user, following the page cursors"""
+    items, cursor = [], None
+    while True:
+        page, cursor = get_summary_history(user_key, config.HISTORY_PAGE_SIZE, cursor)
+        items.extend(page)
+        if not cursor:
+            return items
+
+def render_job(job):
+    with st.container(border=True):
+        st.markdown(f"**{job.description}**")
+        if job.active:
+            st.progress(job.progress, text=translate_text(job.message, target_lang))
+            if config.STREAM_SUMMARIES and job.draft:
+                st.markdown("".join(job.draft))
+        elif job.status == "done" and "download" in job.result:
+            download = job.result["download"]
+            st.success(translate_text("Your file is ready!", target_lang))
+            st.download_button(translate_text(download["label"], target_lang), data=download["data"],
+                               file_name=download["file_name"], mime=download["mime"],
+                               key=f"job_download_{job.id}", on_click="ignore")
+        elif job.status == "done":
+            st.success(translate_text("Summary generated!", target_lang))
+            st.markdown(job.result["summary"])
+            show_download_buttons(job.result["summary"], job.result["summary_id"])
+        else:
+            st.error(translate_text("Job failed:", target_lang) + f" {job.error}")
+        if not job.active and st.button(translate_text("Dismiss", target_lang), key=f"dismiss_{job.id}"):
+            get_job_manager().dismiss(job.id)
+            st.rerun()
+
+def show_summary_jobs():
+    """Status of the user's background summaries; the panel polls only while one is running"""
+    manager = get_job_manager()
+    polling = any(job.active for job in manager.jobs_for(st.session_state.username))
+
+    @st.fragment(run_every=config.JOB_POLL_SECONDS if polling else None)
+    def job_panel():
+        jobs = manager.jobs_for(st.session_state.username)
+        if polling and not any(job.active for job in jobs):
+            st.rerun()  # full rerun so the history list picks up the new summaries
+        for job in jobs:
+            render_job(job)
+
+    job_panel()
 
-Return the summary in markdown format with appropriate headings.
-""")
 # --- Main Page ---
 def main_page():
     role_display = {
@@ -804,82 +835,62 @@ def main_page():
     ])
 
     if groq_api_key:
+        from llm_client import create_llm
         try:
-            llm = ChatGroq(model="llama3-8b-8192", groq_api_key=groq_api_key, temperature=0.3)
+            llm = create_llm(groq_api_key)
         except Exception as e:
             st.error(translate_text(f"Error initializing Groq model: {e}", target_lang))
             return
 
-        prompt_template = PromptTemplate.from_template("""
-You are a helpful assistant summarizing the following content. Use headings (##) and subheadings (###) to organize the summary. Keep it concise and informative.
-
-Content: {text}
-
-Return the summary in markdown format.
-""")
-        chain = load_summarize_chain(llm, chain_type="stuff", prompt=prompt_template)
 
         if option == translate_text("Summarize Website/YouTube", target_lang):
             st.header("🌐 " + translate_text("Summarize from Website or YouTube", target_lang))
             url = st.text_input(translate_text("Enter a website or YouTube URL", target_lang))
             if validators.url(url) and st.button(translate_text("Generate Summary", target_lang)):
-                try:
-                    loader = YoutubeLoader.from_youtube_url(url) if "youtube" in url.lower() else WebBaseLoader(url)
-                    documents = loader.load()
-                    if not documents:
-                        st.warning(translate_text("No content found at the URL.", target_lang))
-                        return
-                    docs = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_documents(documents)[:3]
-                    summary = "\n\n".join(chain.run([doc]) for doc in docs)
-                    summary = clean_text(summary)  # Clean text before translation
-                    if target_lang != "en":
-                        summary = GoogleTranslator(source='auto', target=target_lang).translate(summary)
-                    st.success(translate_text("Summary generated!", target_lang))
-                    st.markdown(summary)
-                    save_summary(st.session_state.username, "url", url, summary)
-                    with open("summary.txt", "w", encoding="utf-8") as f:
-                        f.write(summary)
-                    pdf_path = generate_pdf(summary)
-                    st.markdown(get_download_link("summary.txt", "📄 " + translate_text("Download TXT", target_lang), "octet-stream"), unsafe_allow_html=True)
-                    st.markdown(get_download_link(pdf_path, "📝 " + translate_text("Download PDF", target_lang), "pdf"), unsafe_allow_html=True)
-                except Exception as e:
-                    st.error(translate_text(f"Error during URL summarization: {e}", target_lang))
+                submit_summary_job(llm, {"source_type": "url", "source": url}, url)
 
         elif option == translate_text("Summarize PDF Textbook", target_lang):
             st.header("📄 " + translate_text("Summarize PDF Textbook", target_lang))
             uploaded_pdf = st.file_uploader(translate_text("Upload your PDF file", target_lang), type=["pdf"])
+            page_range = st.text_input(translate_text("Pages to summarize (e.g. 1-50, blank for all)", target_lang))
             if uploaded_pdf and st.button(translate_text("Generate Summary", target_lang)):
-                try:
-                    with open("temp_uploaded_file.pdf", "wb") as f:
-                        f.write(uploaded_pdf.read())
-                    loader = PyPDFLoader("temp_uploaded_file.pdf")
-                    documents = loader.load()
-                    docs = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_documents(documents)[:3]
-                    summary = "\n\n".join(chain.run([doc]) for doc in docs)
-                    summary = clean_text(summary)  # Clean text before translation
-                    if target_lang != "en":
-                        summary = GoogleTranslator(source='auto', target=target_lang).translate(summary)
-                    st.success(translate_text("Summary generated!", target_lang))
-                    st.markdown(summary)
-                    save_summary(st.session_state.username, "pdf", uploaded_pdf.name, summary)
-                    with open("summary.txt", "w", encoding="utf-8") as f:
-                        f.write(summary)
-                    pdf_path = generate_pdf(summary)
-                    st.markdown(get_download_link("summary.txt", "📄 " + translate_text("Download TXT", target_lang), "octet-stream"), unsafe_allow_html=True)
-                    st.markdown(get_download_link(pdf_path, "📝 " + translate_text("Download PDF", target_lang), "pdf"), unsafe_allow_html=True)
-                    os.remove("temp_uploaded_file.pdf")
-                except Exception as e:
-                    st.error(translate_text(f"Error during PDF summarization: {e}", target_lang))
+                submit_summary_job(llm, {"source_type": "pdf", "source": uploaded_pdf.getvalue(),
+                                         "name": uploaded_pdf.name, "pages": page_range}, uploaded_pdf.name)
     else:
         st.warning(translate_text("Please enter your Groq API key.", target_lang))
 
+    show_summary_jobs()
+
     st.write("---")
     st.subheader(translate_text("Your Summary History", target_lang))
-    history = get_summary_history(st.session_state.username)
+    history_cursors = st.session_state.setdefault("history_cursors", [None])
+    if groq_api_key and st.button("🗂️ " + translate_text("Export all summaries as slides (ZIP)", target_lang)):
+        items = all_history_items(st.session_state.username)
+        if items:
+            submit_download_job(llm, f"🗂️ {len(items)} slide decks", export_decks_job, get_history_store(), items, target_lang)
+            st.rerun()
+        st.info(translate_text("No summary history found.", target_lang))
+    search_query = st.text_input("🔍 " + translate_text("Search your summaries", target_lang), key="history_search")
+    if search_query.strip():
+        history = search_summary_history(st.session_state.username, search_query, config.HISTORY_PAGE_SIZE)
+        next_cursor = None
+    else:
+        history, next_cursor = get_summary_history(st.session_state.username, config.HISTORY_PAGE_SIZE, history_cursors[-1])
     if history:
         for item in history:
-            with st.expander(f"[{item['source_type'].upper()}] {item['source_value']} - {item['timestamp']}"):
-                st.markdown(item['summary'])
+            is_open = st.session_state.get(f"open_summary_{item['id']}", False)
+            with st.expander(f"[{item['source_type'].upper()}] {item['source_value']} - {item['timestamp']}", expanded=is_open):
+                if not is_open:
+                    if item.get('snippet'):
+                        st.markdown(item['snippet'])
+                    if st.button("📖 " + translate_text("Open Summary", target_lang), key=f"open_{item['id']}"):
+                        st.session_state[f"open_summary_{item['id']}"] = True
+                        st.rerun()
+                    continue
+                summary_text = get_summary_text(item['id'])
+                st.markdown(summary_text)
+                show_download_buttons(summary_text, f"history_{item['id']}")
+                show_section_summaries(item['id'])
                 
                 # Action buttons for each summary
                 col1, col2, col3, col4 = st.columns([1,1,1,1])
@@ -905,40 +916,55 @@ Return the summary in markdown format.
                 with col4:
                     if st.button(translate_text("🗑️ Delete", target_lang), key=f"delete_{item['id']}"):
                         delete_summary(item['id'])
+                        artifact_store.delete(item['id'])
+                        st.session_state.pop(f"summary_body_{item['id']}", None)
                         st.rerun()
                 
                 # Show mindmap if requested
                 if st.session_state.get(f"show_mindmap_{item['id']}"):
                     st.subheader("🧠 Mindmap")
-                    graph, structure = generate_mindmap(item['summary'], llm)
+                    regenerate = st.button("🔄 Regenerate Mindmap", key=f"regen_mindmap_{item['id']}")
+                    graph, structure = generate_mindmap(summary_text, llm, item['id'], regenerate)
                     if graph:
                         st.graphviz_chart(graph, use_container_width=True)
                 
                 # Show chatbot if requested
                 if st.session_state.get(f"show_chat_{item['id']}"):
-                    summary_chatbot(item['summary'], item['id'], llm)
+                    summary_chatbot(summary_text, item['id'], llm)
                 
                 # Show quiz if requested
                 if st.session_state.get(f"show_quiz_{item['id']}"):
                     st.subheader("📝 Quiz")
                     if st.button("Generate New Quiz", key=f"new_quiz_{item['id']}"):
-                        st.session_state.quiz_answers = {}
-                        st.session_state.quiz_score = 0
+                        st.session_state.pop('quiz_data', None)
+                        st.session_state[f"regen_quiz_{item['id']}"] = True
                         st.rerun()
-                    generate_quiz(item['summary'], llm)
+                    generate_quiz(summary_text, llm, item['id'], st.session_state.pop(f"regen_quiz_{item['id']}", False))
                 
                 # Audio option - always visible when expanded
                 st.markdown("---")
                 st.subheader("🔊 Audio Summary")
                 if st.button("▶️ Listen to Summary (2 min)", key=f"audio_{item['id']}"):
-                    audio_file = generate_audiobook(item['summary'],llm)
-                    if audio_file:
-                        st.audio(audio_file)
-                        # Clean up the temporary file after playback
-                        try:
-                            os.unlink(audio_file)
-                        except:
-                            pass
+                    st.session_state[f"show_audio_{item['id']}"] = True
+                if st.session_state.get(f"show_audio_{item['id']}"):
+                    audio = generate_audiobook(summary_text, llm, item['id'])
+                    if audio:
+                        st.audio(audio[0], format=audio[1])
+
+                st.markdown("---")
+                st.subheader("📊 " + translate_text("Slides", target_lang))
+                if groq_api_key:
+                    show_slides(item['id'], summary_text, item['source_value'], llm)
+
+        prev_col, next_col = st.columns(2)
+        with prev_col:
+            if len(history_cursors) > 1 and st.button("⬅️ " + translate_text("Newer", target_lang)):
+                history_cursors.pop()
+                st.rerun()
+        with next_col:
+            if next_cursor and st.button(translate_text("Older", target_lang) + " ➡️"):
+                history_cursors.append(next_cursor)
+                st.rerun()
     else:
         st.info(translate_text("No summary history found.", target_lang))
     if st.sidebar.button(translate_text("Logout", target_lang)):
@@ -949,16 +975,17 @@ Return the summary in markdown format.
 
 
 # --- Routing ---
-if st.session_state.page == "role_select":
-    role_selection_page()
-elif st.session_state.page == "login":
-    login_page()
-elif st.session_state.page == "register":
-    register_page()
-elif st.session_state.page == "forgot_password":
-    forgot_password_page()
-elif st.session_state.page == "main" and st.session_state.logged_in:
-    main_page()
-else:
-    st.session_state.page = "role_select"
-    role_selection_page()
\ No newline at end of file
+with timed(f"render_{st.session_state.page}"):
+    if st.session_state.page == "role_select":
+        role_selection_page()
+    elif st.session_state.page == "login":
+        login_page()
+    elif st.session_state.page == "register":
+        register_page()
+    elif st.session_state.page == "forgot_password":
+        forgot_password_page()
+    elif st.session_state.page == "main" and st.session_state.logged_in:
+        main_page()
+    else:
+        st.session_state.page = "role_select"
+        role_selection_page()
\ No newline at end of file
@@ -0,0 +1,91 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from summary_service import Progress
+
+# --- Jobs ---
+class Job(Progress):
+    """State of one background job, updated by the worker and read by the page"""
+
+    def __init__(self, user_key, description):
+        self.id = uuid.uuid4().hex[:12]
+        self.user_key = user_key
+        self.description = description
+        self.status = "queued"  # queued -> running -> done | failed
+        self.progress = 0.0
+        self.message = "Waiting for a free worker"
+        self.draft = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def update(self, fraction, message):
+        self.progress = fraction
+        self.message = message
+
+    def token(self, text):
+        self.draft.append(text)
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+# --- Job Manager ---
+class JobManager:
+    """Runs jobs on a bounded worker pool, independent of any Streamlit script run"""
+
+    def __init__(self, max_workers=None, max_jobs_per_user=None, describe_error=str):
+        self.max_jobs_per_user = max_jobs_per_user or config.MAX_JOBS_PER_USER
+        self.describe_error = describe_error  # turns a job's exception into the text shown to the user
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or config.MAX_CONCURRENT_JOBS,
+                                            thread_name_prefix="summary-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user_key, description, fn, *args, **kwargs):
+        """Queue fn(*args, progress=job, **kwargs) and return the job id"""
+        with self._lock:
+            self._prune()
+            active = sum(1 for job in self._jobs.values() if job.user_key == user_key and job.active)
+            if active >= self.max_jobs_per_user:
+                raise RuntimeError(f"You already have {active} summaries in progress. Please wait for one to finish.")
+            job = Job(user_key, description)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        job.message = "Starting"
+        try:
+            job.result = fn(*args, progress=job, **kwargs)
+            job.status = "done"
+        except Exception as e:
+            job.error = self.describe_error(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs_for(self, user_key):
+        """The user's jobs, newest first"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.user_key == user_key]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def dismiss(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and not job.active:
+                del self._jobs[job_id]
+
+    def _prune(self):
+        cutoff = time.time() - config.JOB_RETENTION_SECONDS
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
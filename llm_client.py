@@ -0,0 +1,236 @@
+"""Rate-limited Groq chat model shared by the app and the batch CLI.
+
+Every Groq call in the process draws from one pair of token buckets
+(requests/min and tokens/min). Waiting calls are served by priority, so a
+chat question jumps ahead of queued summary chunks, and rate-limit errors
+are retried with jittered exponential backoff. Identical requests that are
+in flight at the same time share a single call (see singleflight.py).
+"""
+import hashlib
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_groq import ChatGroq
+
+import config
+from metrics import metrics
+from singleflight import single_flight, file_flight
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0  # chat, quiz, mindmap and other on-click requests
+PRIORITY_BACKGROUND = 1   # summary jobs started from the app
+PRIORITY_BATCH = 2        # the batch CLI
+
+# --- Token Bucket ---
+class TokenBucketLimiter:
+    """Requests-per-minute and tokens-per-minute buckets shared by all threads"""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.capacity = {
+            "requests": requests_per_minute or float("inf"),
+            "tokens": tokens_per_minute or float("inf"),
+        }
+        self.level = dict(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._waiters = []
+        self._tickets = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed, self.updated = now - self.updated, now
+        for name, capacity in self.capacity.items():
+            self.level[name] = min(capacity, self.level[name] + elapsed * capacity / 60)
+
+    def _wait_time(self, tokens):
+        wait = max(0.0, self.paused_until - time.monotonic())
+        for name, needed in (("requests", 1), ("tokens", tokens)):
+            missing = needed - self.level[name]
+            if missing > 0:
+                wait = max(wait, missing * 60 / self.capacity[name])
+        return wait
+
+    def acquire(self, tokens, priority=PRIORITY_BACKGROUND):
+        """Block until a call of about `tokens` tokens may start; returns the seconds waited"""
+        tokens = min(tokens, self.capacity["tokens"])  # an oversized call must not wait forever
+        ticket = (priority, next(self._tickets))
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    self._refill()
+                    # Only the highest-priority, longest-waiting caller may take from the buckets
+                    wait = self._wait_time(tokens) if self._waiters[0] == ticket else None
+                    if wait == 0:
+                        self.level["requests"] -= 1
+                        self.level["tokens"] -= tokens
+                        return time.monotonic() - started
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def settle(self, estimated, actual):
+        """Correct the token bucket once the response reports the tokens really used"""
+        if actual is None:
+            return
+        with self._cond:
+            self.level["tokens"] -= actual - min(estimated, self.capacity["tokens"])
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Hold every caller back after the API reports a rate limit"""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+limiter = TokenBucketLimiter(config.GROQ_REQUESTS_PER_MINUTE, config.GROQ_TOKENS_PER_MINUTE)
+
+# --- Retries ---
+def is_rate_limit_error(error):
+    return getattr(error, "status_code", None) == 429
+
+def backoff_delay(error, attempt):
+    """Seconds to wait before retry `attempt`: the server's Retry-After, else jittered exponential"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        delay = min(config.GROQ_MAX_BACKOFF_SECONDS, config.GROQ_BACKOFF_SECONDS * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+# --- Metrics ---
+def _record_call(started, waited, error, prompt_tokens=None, completion_tokens=None, estimated=False):
+    """Latency, rate-limit wait and token usage of one upstream call"""
+    seconds = time.perf_counter() - started
+    status = "ok" if error is None else "rate_limited" if is_rate_limit_error(error) else "error"
+    metrics.observe("rate_limit_wait", waited)
+    metrics.observe("llm_call", seconds, error=error is not None, prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens)
+    metrics.count("groq_requests_total", status=status)
+    source = "estimated" if estimated else "reported"
+    if prompt_tokens:
+        metrics.count("groq_tokens_total", prompt_tokens, kind="prompt", source=source)
+    if completion_tokens:
+        metrics.count("groq_tokens_total", completion_tokens, kind="completion", source=source)
+
+# --- Deduplication ---
+def _result_to_json(result):
+    return {"generations": [{"content": g.message.content, "generation_info": g.generation_info}
+                            for g in result.generations],
+            "llm_output": result.llm_output}
+
+def _result_from_json(data):
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=g["content"]),
+                                                  generation_info=g["generation_info"])
+                                   for g in data["generations"]],
+                      llm_output=data["llm_output"])
+
+# --- Chat Model ---
+class RateLimitedChatGroq(ChatGroq):
+    """ChatGroq whose calls go through the shared limiter and retry on 429s"""
+
+    priority: int = PRIORITY_BACKGROUND
+
+    def with_priority(self, priority):
+        """The same model and client, queued at a different priority"""
+        # copy() would drop the fields marked exclude=True, such as the client and callbacks
+        fields = {name: getattr(self, name) for name in self.__fields__}
+        return type(self)(**{**fields, "priority": priority})
+
+    def _estimate_tokens(self, messages):
+        from pipeline import count_tokens
+        prompt_tokens = sum(count_tokens(str(message.content)) for message in messages)
+        return prompt_tokens + (self.max_tokens or config.GROQ_OUTPUT_TOKENS_ESTIMATE)
+
+    def _request_key(self, messages, stop, kwargs):
+        """Identifies requests that must get the same answer: API key, model, parameters and prompt.
+
+        The key is part of it because a leader's failure (invalid key, spent
+        quota) must not be handed to callers using a different key.
+        """
+        api_key = self.groq_api_key.get_secret_value() if self.groq_api_key else ""
+        request = {
+            "account": hashlib.sha256(api_key.encode("utf-8")).hexdigest(),
+            "model": self.model_name, "temperature": self.temperature, "max_tokens": self.max_tokens,
+            "model_kwargs": self.model_kwargs, "stop": stop, "kwargs": kwargs,
+            "messages": [(message.type, message.content) for message in messages],
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.streaming:
+            # ChatGroq routes this through _stream, which is deduplicated and limited below
+            return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        call = lambda: self._limited_generate(messages, stop, run_manager, kwargs)
+        if not config.SINGLE_FLIGHT:
+            return call()
+        key = self._request_key(messages, stop, kwargs)
+        if config.SINGLE_FLIGHT_DIR:
+            shared = lambda: _result_from_json(file_flight(key, lambda: _result_to_json(call())))
+            return single_flight.do(key, shared)
+        return single_flight.do(key, call)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        call = lambda: self._limited_stream(messages, stop, run_manager, kwargs)
+        if not config.SINGLE_FLIGHT:
+            return call()
+        # Streams are shared within the process only
+        return single_flight.stream(self._request_key(messages, stop, kwargs), call)
+
+    def _limited_generate(self, messages, stop, run_manager, kwargs):
+        estimate = self._estimate_tokens(messages)
+        for attempt in itertools.count():
+            waited = limiter.acquire(estimate, self.priority)
+            started = time.perf_counter()
+            try:
+                result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                _record_call(started, waited, e)
+                if not is_rate_limit_error(e) or attempt >= config.GROQ_MAX_RETRIES:
+                    raise
+                limiter.pause(backoff_delay(e, attempt))
+                continue
+            usage = (result.llm_output or {}).get("token_usage") or {}
+            _record_call(started, waited, None, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+            limiter.settle(estimate, usage.get("total_tokens"))
+            return result
+
+    def _limited_stream(self, messages, stop, run_manager, kwargs):
+        estimate = self._estimate_tokens(messages)
+        from pipeline import count_tokens
+        for attempt in itertools.count():
+            waited = limiter.acquire(estimate, self.priority)
+            started = time.perf_counter()
+            text = []
+            try:
+                for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    text.append(chunk.text)
+                    yield chunk
+            except Exception as e:
+                _record_call(started, waited, e)
+                # Once tokens have been yielded the call cannot be replayed
+                if text or not is_rate_limit_error(e) or attempt >= config.GROQ_MAX_RETRIES:
+                    raise
+                limiter.pause(backoff_delay(e, attempt))
+                continue
+            # Streamed responses carry no usage block here, so tokens are counted locally
+            prompt_tokens = estimate - (self.max_tokens or config.GROQ_OUTPUT_TOKENS_ESTIMATE)
+            completion_tokens = count_tokens("".join(text))
+            _record_call(started, waited, None, prompt_tokens, completion_tokens, estimated=True)
+            limiter.settle(estimate, prompt_tokens + completion_tokens)
+            return
+
+def create_llm(api_key, priority=PRIORITY_INTERACTIVE):
+    # Retries are handled here, with the shared limiter, instead of inside the Groq SDK
+    return RateLimitedChatGroq(model=config.GROQ_MODEL, groq_api_key=api_key,
+                               temperature=config.GROQ_TEMPERATURE, max_retries=0, priority=priority)
@@ -0,0 +1,357 @@
+"""Concurrent-session load test of the Streamlit app.
+
+Usage: python loadtest.py [--sessions 1,5,10,20] [--latency 0.2] [--slo 2.0]
+
+Starts final.py under one real Streamlit server and drives N simulated users
+at once over its websocket, the way browsers do: role select -> login ->
+summarize a URL -> wait for the background job -> open it from the history
+-> quiz -> mindmap. Groq, the URL loaders and Google Translate are the local
+fakes from benchmark.py, installed in the server process; the app's own
+storage (users, SQLite history, caches) is real and lives in a temp
+directory that is removed afterwards. For each N it reports the latency
+distribution of script reruns, session error rate and time to summary, and
+the largest N that stayed within the --slo p95 rerun latency with no errors.
+
+Every session is a thread with its own websocket, so all sessions share the
+server's script threads, job manager and caches as real users would.
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import urllib.request
+import zlib
+
+import config
+from benchmark import FakeLoader, install_fakes, synthetic_text
+from metrics import metrics, quantile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "final.py")
+PASSWORD = "LoadTest1"
+
+QUIZ = "\n".join(
+    f"Q) Question {i}?\nA) One\nB) Two\nC) Three\nD) Four\nAnswer: B) Two\nExplanation: Because {i}."
+    for i in range(1, 4))
+MINDMAP = "# Topic\n- Branch one\n* Leaf a\n* Leaf b\n- Branch two\n- Branch three\n- Branch four"
+
+def respond(prompt):
+    """Well-formed answers for the prompts whose output the app parses"""
+    if "multiple choice quiz" in prompt:
+        return QUIZ
+    if "radial mindmap" in prompt:
+        return MINDMAP
+    return None
+
+def user_name(level, index):
+    # Fresh users per level, so a session's job panel and history only show its own summary
+    return f"load{level}user{index}"
+
+# --- Simulated Session ---
+class Session:
+    """One user clicking through the app over its own websocket; every rerun is timed"""
+
+    def __init__(self, user, url, port, timeout):
+        self.user = user
+        self.url = url
+        self.endpoint = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.timeout = timeout
+        self.socket = None
+        self.elements = {}  # delta path -> Element, as rendered by the last finished run
+        self.values = {}  # widget id -> WidgetState the user has entered
+        self.reruns = []  # (step, seconds)
+        self.error = None
+        self.summary_seconds = None
+
+    def connect(self):
+        from websockets.sync.client import connect
+        return connect(self.endpoint, subprotocols=["streamlit"], max_size=None, open_timeout=self.timeout)
+
+    def _receive_run(self, deadline):
+        """Elements of the next run to finish; runs cut short by st.rerun() are skipped"""
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        elements = {}
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutError("the script run did not finish in time")
+            msg = ForwardMsg.FromString(self.socket.recv(timeout=remaining))
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                elements = {}
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                elements[tuple(msg.metadata.delta_path)] = msg.delta.new_element
+            elif kind == "script_finished" and msg.script_finished in (
+                    ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR):
+                return elements
+
+    def run(self, step, click=None):
+        """Send a rerun with the entered widget values (and a button click) and wait for it"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        rendered = {getattr(element, element.WhichOneof("type")).id for element in self.elements.values()
+                    if element.WhichOneof("type") in ("button", "text_input", "selectbox")}
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()  # a rerun with no widget values is still a rerun
+        states = msg.rerun_script.widget_states.widgets
+        for widget_id, state in self.values.items():
+            if widget_id in rendered:
+                states.add().CopyFrom(state)
+        if click is not None:
+            state = states.add()
+            state.id = click
+            state.trigger_value = True
+        started = time.perf_counter()
+        self.socket.send(msg.SerializeToString())
+        self.elements = self._receive_run(started + self.timeout)
+        self.reruns.append((step, time.perf_counter() - started))
+        for element in self.elements.values():
+            if element.WhichOneof("type") == "exception":
+                raise RuntimeError(f"{step}: {element.exception.message}")
+        errors = self._alerts("error")
+        if errors:
+            raise RuntimeError(f"{step}: {errors[0]}")
+
+    def _alerts(self, level):
+        from streamlit.proto.Alert_pb2 import Alert
+        wanted = {"error": Alert.ERROR, "success": Alert.SUCCESS}[level]
+        return [element.alert.body for element in self.elements.values()
+                if element.WhichOneof("type") == "alert" and element.alert.format == wanted]
+
+    def _widget(self, kind, label):
+        for element in self.elements.values():
+            if element.WhichOneof("type") == kind:
+                widget = getattr(element, kind)
+                if widget.label == label or widget.label.endswith(label):
+                    return widget.id
+        raise RuntimeError(f"no {kind} labelled {label!r}")
+
+    def enter(self, kind, label, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        widget_id = self._widget(kind, label)
+        self.values[widget_id] = WidgetState(id=widget_id, string_value=value)
+
+    def click(self, label):
+        return self._widget("button", label)
+
+    def flow(self):
+        self.run("role_select")
+        self.run("choose_role", click=self.click("Student"))
+        self.enter("text_input", "Username", self.user)
+        self.enter("text_input", "Password", PASSWORD)
+        self.run("login", click=self.click("Login"))
+        self.run("main")
+        self.enter("text_input", "Groq API Key", "load-test")
+        self.enter("selectbox", "Select content type:", "Summarize Website/YouTube")
+        self.run("choose_source")
+        self.enter("text_input", "Enter a website or YouTube URL", self.url)
+        self.run("enter_url")
+        started = time.perf_counter()
+        self.run("submit", click=self.click("Generate Summary"))
+        while not any("Summary generated" in body for body in self._alerts("success")):
+            if time.perf_counter() - started > self.timeout:
+                raise RuntimeError("summary did not finish in time")
+            time.sleep(config.JOB_POLL_SECONDS)
+            self.run("poll_job")
+        self.summary_seconds = time.perf_counter() - started
+        self.run("open_history", click=self.click("Open Summary"))
+        self.run("quiz", click=self.click("Quiz"))
+        self.run("mindmap", click=self.click("Mindmap"))
+
+    def __call__(self):
+        try:
+            with self.connect() as self.socket:
+                self.flow()
+        except Exception as e:
+            self.error = str(e) or traceback.format_exc(limit=1)
+        return self
+
+# --- Server Process ---
+class SyntheticCorpus(dict):
+    """Synthetic text for any URL, so the server needs no list of the sessions' URLs"""
+
+    def __init__(self, tokens):
+        super().__init__()
+        self.tokens = tokens
+
+    def __missing__(self, url):
+        text = self[url] = synthetic_text(self.tokens, seed=zlib.crc32(url.encode()))
+        return text
+
+def configure(workdir):
+    """Point the app's storage at workdir"""
+    os.chdir(workdir)  # users.db and the default cache/history files are relative paths
+    config.HISTORY_BACKEND = "sqlite"
+    config.RAG_ENABLED = False
+    config.METRICS_PORT = 0
+    metrics.set_log_path("")  # never write a log, even when METRICS_LOG_PATH is set
+
+def install_app_fakes(args):
+    """Route the app's Groq, loader and translator calls to the fakes"""
+    import llm_client
+    client = install_fakes(args)
+    client.responder = respond
+    FakeLoader.corpus = SyntheticCorpus(args.doc_tokens)
+    llm_client.limiter = llm_client.TokenBucketLimiter(0, 0)
+    llm_client.create_llm = lambda api_key, priority=llm_client.PRIORITY_INTERACTIVE: llm_client.RateLimitedChatGroq(
+        model=config.GROQ_MODEL, groq_api_key=api_key, client=client, temperature=config.GROQ_TEMPERATURE,
+        max_retries=0, priority=priority)
+
+def serve(args, workdir, port):
+    """Entry point of the server process: final.py under Streamlit with the fakes installed"""
+    from streamlit.web import bootstrap
+    configure(workdir)
+    install_app_fakes(args)
+    flag_options = {"server_port": port, "server_address": "127.0.0.1", "server_headless": True,
+                    "server_fileWatcherType": "none", "server_runOnSave": False,
+                    "browser_gatherUsageStats": False, "logger_level": "error"}
+    bootstrap.load_config_options(flag_options)
+    bootstrap.run(APP_PATH, False, [], flag_options)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(args, workdir):
+    """The server process and its port, once the app answers health checks"""
+    port = free_port()
+    process = multiprocessing.get_context("spawn").Process(target=serve, args=(args, workdir, port), daemon=True)
+    process.start()
+    deadline = time.perf_counter() + args.timeout
+    while time.perf_counter() < deadline and process.is_alive():
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process, port
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError("the Streamlit server did not start")
+
+def stop_server(process):
+    process.terminate()
+    process.join(timeout=10)
+    if process.is_alive():
+        process.kill()
+
+def prepare(workdir, levels):
+    """Register the simulated users of every level"""
+    conn = sqlite3.connect(os.path.join(workdir, "users.db"))
+    conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                 "username TEXT UNIQUE NOT NULL, password TEXT NOT NULL)")
+    conn.executemany("INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)",
+                     [(user_name(level, i), PASSWORD) for level, n in enumerate(levels) for i in range(n)])
+    conn.commit()
+    conn.close()
+
+def warm_up(port, timeout):
+    """One untimed run, so module imports and the first compile are not counted as rerun latency"""
+    session = Session("warmup", "", port, timeout)
+    with session.connect() as session.socket:
+        session.run("warm_up")
+
+# --- Load Levels ---
+def run_level(n, level, args, port):
+    # New URLs per level so every session really summarizes something
+    sessions = [Session(user_name(level, i), f"https://example.com/load/{level}/{i}", port, args.timeout)
+                for i in range(n)]
+    barrier = threading.Barrier(n)
+
+    def start(session):
+        barrier.wait()  # everyone starts at once
+        session()
+
+    threads = [threading.Thread(target=start, args=(session,), daemon=True) for session in sessions]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=args.timeout * 3)
+    wall = time.perf_counter() - started
+    for session, thread in zip(sessions, threads):
+        if thread.is_alive():
+            session.error = "session did not finish"
+
+    reruns = sorted(seconds for s in sessions for _, seconds in s.reruns)
+    steps = {}
+    for s in sessions:
+        for step, seconds in s.reruns:
+            steps.setdefault(step, []).append(seconds)
+    summaries = sorted(s.summary_seconds for s in sessions if s.summary_seconds is not None)
+    failed = [s for s in sessions if s.error]
+    return {
+        "sessions": n,
+        "reruns": len(reruns),
+        "p50": quantile(reruns, 0.5),
+        "p95": quantile(reruns, 0.95),
+        "p99": quantile(reruns, 0.99),
+        "max": reruns[-1] if reruns else 0.0,
+        "error_rate": len(failed) / n,
+        "summary_p50": quantile(summaries, 0.5),
+        "wall": wall,
+        "errors": [f"{s.user}: {s.error}" for s in failed],
+        "steps": {step: quantile(sorted(values), 0.95) for step, values in steps.items()},
+    }
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="smartsummarizer-load-")
+    try:
+        return _run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def _run(args, workdir):
+    prepare(workdir, args.sessions)
+    process, port = start_server(args, workdir)
+    try:
+        warm_up(port, args.timeout)
+        rows = []
+        for level, n in enumerate(args.sessions):
+            result = run_level(n, level, args, port)
+            rows.append(result)
+            print(f"  {n} sessions: p95 {result['p95']:.2f}s, {result['error_rate']:.0%} failed", file=sys.stderr)
+            for error in result["errors"][:3]:
+                print(f"    {error}", file=sys.stderr)
+        return rows
+    finally:
+        stop_server(process)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=lambda s: [int(x) for x in s.split(",")], default=[1, 5, 10, 20],
+                        help="concurrent session counts to try, comma-separated")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake Groq seconds per call")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="fake Groq seconds per output token")
+    parser.add_argument("--output-tokens", type=int, default=150, help="fake Groq tokens per answer")
+    parser.add_argument("--loader-latency", type=float, default=0.1, help="fake URL loader seconds per load")
+    parser.add_argument("--translate-latency", type=float, default=0.0, help="fake translator seconds per call")
+    parser.add_argument("--doc-tokens", type=int, default=5000, help="size of each summarized page in tokens")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds before a rerun or summary counts as failed")
+    parser.add_argument("--slo", type=float, default=2.0, help="p95 rerun latency target in seconds")
+    args = parser.parse_args()
+
+    rows = run(args)
+    within_slo = None
+    for r in rows:
+        if r["error_rate"] == 0 and r["p95"] <= args.slo:
+            within_slo = r["sessions"]
+    print(f"{'sessions':>8} {'reruns':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'errors':>7} {'summary':>8} {'wall':>7}")
+    for r in rows:
+        print(f"{r['sessions']:>8} {r['reruns']:>7} {r['p50']:>7.2f} {r['p95']:>7.2f} {r['p99']:>7.2f} "
+              f"{r['max']:>7.2f} {r['error_rate']:>7.0%} {r['summary_p50']:>8.2f} {r['wall']:>7.1f}")
+    slowest = sorted(rows[-1]["steps"].items(), key=lambda item: -item[1])[:5]
+    print(f"\nSlowest steps at {rows[-1]['sessions']} sessions (p95): "
+          + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in slowest))
+    if within_slo:
+        print(f"\nUp to {within_slo} concurrent sessions stayed within p95 {args.slo}s with no errors.")
+    else:
+        print(f"\nNo tested level stayed within p95 {args.slo}s with no errors.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Per-stage latency and Groq token metrics.
+
+Stages are timed with `timed("stage")` (a context manager or decorator) and
+recorded in a Prometheus-style histogram, a window of recent samples for
+p50/p95/p99, and optionally a JSONL log with one line per observation.
+
+Usage: python metrics.py [metrics.jsonl]   # p50/p95/p99 per stage from a log
+"""
+import bisect
+import collections
+import contextlib
+import json
+import sys
+import threading
+import time
+
+import config
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = "smartsummarizer"
+
+def quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+class _Stage:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.recent = collections.deque(maxlen=config.METRICS_WINDOW)
+
+    def observe(self, seconds, error):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.errors += error
+        self.recent.append(seconds)
+
+# --- Registry ---
+class Metrics:
+    def __init__(self, log_path=None):
+        self._stages = collections.defaultdict(_Stage)
+        self._counters = collections.Counter()
+        self._lock = threading.Lock()
+        self._log_path = config.METRICS_LOG_PATH if log_path is None else log_path
+        self._log = None
+
+    def observe(self, stage, seconds, error=False, **fields):
+        with self._lock:
+            self._stages[stage].observe(seconds, error)
+            if self._log_path:
+                if self._log is None:
+                    self._log = open(self._log_path, "a", encoding="utf-8", buffering=1)
+                record = {"ts": round(time.time(), 3), "stage": stage, "seconds": round(seconds, 6),
+                          "status": "error" if error else "ok", **fields}
+                self._log.write(json.dumps(record, default=str) + "\n")
+
+    def set_log_path(self, path):
+        """Start (or with "" stop) the JSONL log, e.g. for a batch run"""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            self._log_path, self._log = path, None
+
+    def count(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def timed(self, stage, **fields):
+        return _Timer(self, stage, fields)
+
+    def timed_iter(self, stage, iterable):
+        """Yield from iterable, recording the total time spent producing items (not consuming them)"""
+        stopwatch = Stopwatch(self, stage)
+        iterator = iter(iterable)
+        try:
+            while True:
+                with stopwatch:
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        break
+                yield item
+        finally:
+            stopwatch.record()
+
+    def table(self):
+        """p50/p95/p99 per stage over the recent samples, as a text table"""
+        with self._lock:
+            samples = {name: list(s.recent) for name, s in self._stages.items()}
+        return format_table(samples)
+
+    def quantiles(self, stage):
+        with self._lock:
+            values = sorted(self._stages[stage].recent)
+        return {q: quantile(values, q) for q in QUANTILES}
+
+    def render(self):
+        """Prometheus text exposition of every metric"""
+        with self._lock:
+            stages = {name: (list(s.buckets), s.count, s.sum, s.errors, sorted(s.recent))
+                      for name, s in self._stages.items()}
+            counters = dict(self._counters)
+        lines = [f"# HELP {PREFIX}_stage_seconds Time spent in each pipeline stage or external call.",
+                 f"# TYPE {PREFIX}_stage_seconds histogram"]
+        for name, (buckets, count, total, _, _) in sorted(stages.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+                cumulative += n
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{stage="{name}"}} {count}')
+        lines += [f"# HELP {PREFIX}_stage_latency_seconds Quantiles over the last {config.METRICS_WINDOW} samples per stage.",
+                  f"# TYPE {PREFIX}_stage_latency_seconds summary"]
+        for name, (_, count, total, _, recent) in sorted(stages.items()):
+            for q in QUANTILES:
+                lines.append(f'{PREFIX}_stage_latency_seconds{{stage="{name}",quantile="{q}"}} {quantile(recent, q):.6f}')
+            lines.append(f'{PREFIX}_stage_latency_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{PREFIX}_stage_latency_seconds_count{{stage="{name}"}} {count}')
+        lines += [f"# TYPE {PREFIX}_stage_errors_total counter"]
+        for name, (_, _, _, errors, _) in sorted(stages.items()):
+            lines.append(f'{PREFIX}_stage_errors_total{{stage="{name}"}} {errors}')
+        typed = set()
+        for (name, labels), value in sorted(counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}_{name} counter")
+                typed.add(name)
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{PREFIX}_{name}{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+class _Timer(contextlib.ContextDecorator):
+    def __init__(self, registry, stage, fields):
+        self.registry, self.stage, self.fields = registry, stage, fields
+
+    def _recreate_cm(self):
+        # A fresh timer per decorated call, so concurrent calls do not share a start time
+        return _Timer(self.registry, self.stage, self.fields)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # BaseExceptions such as Streamlit's rerun signal are control flow, not failures
+        error = exc_type is not None and issubclass(exc_type, Exception)
+        self.registry.observe(self.stage, time.perf_counter() - self.started, error=error, **self.fields)
+        return False
+
+class Stopwatch:
+    """Accumulates time over several `with` blocks and records it as one observation"""
+
+    def __init__(self, registry, stage):
+        self.registry, self.stage = registry, stage
+        self.elapsed = 0.0
+        self.error = False
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed += time.perf_counter() - self.started
+        self.error = self.error or (exc_type is not None and issubclass(exc_type, Exception))
+        return False
+
+    def record(self):
+        self.registry.observe(self.stage, self.elapsed, error=self.error)
+
+metrics = Metrics()
+timed = metrics.timed
+timed_iter = metrics.timed_iter
+
+# --- HTTP Endpoint ---
+def serve(port=None, host=None):
+    """Serve /metrics on a daemon thread; returns the server, or None if disabled or the port is taken"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    port = config.METRICS_PORT if port is None else port
+    if not port:
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host or config.METRICS_HOST, port), Handler)
+    except OSError:
+        return None  # another process (e.g. a second app worker) already serves it
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+# --- Reports ---
+def format_table(samples):
+    """Text table of {stage: [seconds]}, the stages with the most total time first"""
+    lines = [f"{'stage':24} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'total':>10}"]
+    for stage, values in sorted(samples.items(), key=lambda item: -sum(item[1])):
+        values = sorted(values)
+        lines.append(f"{stage:24} {len(values):7d} " + " ".join(f"{quantile(values, q):9.3f}" for q in QUANTILES)
+                     + f" {sum(values):10.1f}")
+    return "\n".join(lines)
+
+def report(path):
+    samples = collections.defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            samples[record["stage"]].append(record["seconds"])
+    print(format_table(samples))
+
+if __name__ == "__main__":
+    report(sys.argv[1] if len(sys.argv) > 1 else config.METRICS_LOG_PATH or "metrics.jsonl")
@@ -0,0 +1,95 @@
+"""Page-parallel PDF text extraction.
+
+Kept free of langchain so spawned worker processes start quickly.
+"""
+import io
+import mmap
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+
+import config
+
+# --- Page Ranges ---
+def parse_page_range(text, page_count):
+    """Parse '5', '3-10' or '12-' (1-based, inclusive) into a range of 0-based page indices"""
+    text = (text or "").strip()
+    if not text:
+        return range(page_count)
+    start, sep, end = text.partition("-")
+    first = int(start) if start.strip() else 1
+    last = (int(end) if end.strip() else page_count) if sep else first
+    first, last = max(1, first), min(page_count, last)
+    if first > last:
+        raise ValueError(f"Invalid page range '{text}' for a {page_count}-page PDF")
+    return range(first - 1, last)
+
+# --- Readers ---
+def _open_reader(source):
+    """PdfReader over a file path (memory-mapped) or an in-memory buffer, without copying to disk"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return PdfReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    if hasattr(source, "read"):
+        source.seek(0)
+        return PdfReader(source)
+    return PdfReader(io.BytesIO(source))
+
+def page_count(source):
+    return len(_open_reader(source).pages)
+
+# --- Worker Process ---
+_worker_reader = None
+
+def _init_worker(source):
+    global _worker_reader
+    _worker_reader = _open_reader(source)
+
+def _extract_batch(indices):
+    return [(i, _worker_reader.pages[i].extract_text() or "") for i in indices]
+
+def _batches(indices, size):
+    indices = list(indices)
+    for start in range(0, len(indices), size):
+        yield indices[start:start + size]
+
+# --- Extraction ---
+def iter_pdf_pages(source, pages=None, max_workers=None):
+    """Yield (page_index, text) in page order.
+
+    `source` is a file path, bytes or a binary file object. Large documents are
+    extracted on a process pool, a batch of pages per task; pages are yielded
+    as soon as the next one in order is ready. In-memory PDFs are spilled to a
+    temporary file first so the workers memory-map it instead of each getting
+    a pickled copy.
+    """
+    reader = _open_reader(source)
+    indices = range(len(reader.pages)) if pages is None else pages
+    max_workers = max_workers or config.PDF_WORKERS
+    if max_workers <= 1 or len(indices) < config.PDF_PARALLEL_MIN_PAGES:
+        for i in indices:
+            yield i, reader.pages[i].extract_text() or ""
+        return
+
+    spilled = None
+    if not isinstance(source, (str, os.PathLike)):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            if hasattr(source, "read"):
+                source.seek(0)
+                shutil.copyfileobj(source, f)
+            else:
+                f.write(source)
+        source = spilled = f.name
+    try:
+        context = multiprocessing.get_context(config.PDF_MP_START_METHOD)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(source,)) as pool:
+            for batch in pool.map(_extract_batch, _batches(indices, config.PDF_PAGES_PER_TASK)):
+                yield from batch
+    finally:
+        if spilled:
+            os.remove(spilled)
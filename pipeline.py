@@ -0,0 +1,267 @@
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from langchain.prompts import PromptTemplate
+from langchain.chains.summarize import load_summarize_chain
+from langchain.docstore.document import Document
+from langchain.document_loaders import YoutubeLoader, WebBaseLoader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+import config
+from metrics import metrics, timed, timed_iter, Stopwatch
+from pdf_ingest import iter_pdf_pages
+
+# --- Prompts ---
+map_prompt_template = PromptTemplate.from_template("""
+You are a helpful assistant summarizing the following content. Use headings (##) and subheadings (###) to organize the summary. Keep it concise and informative.
+
+Content: {text}
+
+Return the summary in markdown format.
+""")
+
+reduce_prompt_template = PromptTemplate.from_template("""
+You are given partial summaries of consecutive sections of one document.
+Merge them into a single coherent summary. Remove repetition, keep the original order of topics,
+and use headings (##) and subheadings (###) to organize it.
+
+Partial summaries:
+{text}
+
+Return the summary in markdown format.
+""")
+
+# --- Loading ---
+@timed("load_url")
+def load_url(url):
+    loader = YoutubeLoader.from_youtube_url(url) if "youtube" in url.lower() else WebBaseLoader(url)
+    return loader.load()
+
+def load_pdf_pages(source, pages=None, name=None):
+    """Lazily yield one Document per PDF page; source is a path, bytes or a binary file object"""
+    name = name or (source if isinstance(source, str) else "uploaded.pdf")
+    for i, text in timed_iter("pdf_extract", iter_pdf_pages(source, pages)):
+        yield Document(page_content=text, metadata={"source": name, "page": i})
+
+# --- Token-Aware Chunking ---
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    # llama3's tokenizer is tiktoken-based; cl100k_base counts within a few percent of it
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(config.TOKENIZER_ENCODING)
+    except Exception:
+        return None
+
+def count_tokens(text):
+    encoding = _encoding()
+    if encoding is None:
+        # Roughly four characters per token for English text
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+def chunk_token_budget():
+    """Largest chunk that fits in one map call next to the prompt and the summary it produces"""
+    if config.CHUNK_TOKENS:
+        return config.CHUNK_TOKENS
+    return config.MODEL_CONTEXT_TOKENS - config.MAP_PROMPT_TOKENS - config.MAP_OUTPUT_TOKENS
+
+# Preferred break points, strongest first: markdown headings, transcript timestamps,
+# paragraphs, lines, sentences, words
+STRUCTURE_SEPARATORS = [
+    r"\n(?=#{1,6} )",
+    r"\n(?=\[?\d{1,2}:\d{2}(?::\d{2})?\]?\s)",
+    r"\n\s*\n",
+    r"\n",
+    r"(?<=[.!?]) ",
+    " ",
+    "",
+]
+
+def _token_splitter(budget):
+    return RecursiveCharacterTextSplitter(
+        separators=STRUCTURE_SEPARATORS,
+        is_separator_regex=True,
+        chunk_size=budget,
+        chunk_overlap=min(config.CHUNK_OVERLAP_TOKENS, budget // 4),
+        length_function=count_tokens,
+    )
+
+def _packed_document(docs):
+    metadata = dict(docs[0].metadata)
+    if "page" in metadata:
+        metadata["last_page"] = docs[-1].metadata.get("page", metadata["page"])
+    # Form feed marks the page breaks inside a packed chunk
+    return Document(page_content="\n\f\n".join(doc.page_content for doc in docs), metadata=metadata)
+
+def iter_split_documents(documents):
+    """Pack consecutive documents (e.g. PDF pages) into chunks of up to chunk_token_budget() tokens.
+
+    Chunks end at document boundaries where possible; a document too large on its
+    own is split at headings, timestamps, paragraphs and sentences. Documents are
+    consumed lazily so chunks flow out while later pages are still loading.
+    """
+    budget = chunk_token_budget()
+    splitter = _token_splitter(budget)
+    pending, pending_tokens = [], 0
+    # Only the splitter's own work is timed, not the loading it pulls from
+    stopwatch = Stopwatch(metrics, "split")
+    try:
+        for doc in documents:
+            if not doc.page_content.strip():
+                continue
+            with stopwatch:
+                tokens = count_tokens(doc.page_content)
+            if pending and pending_tokens + tokens > budget:
+                yield _packed_document(pending)
+                pending, pending_tokens = [], 0
+            if tokens > budget:
+                with stopwatch:
+                    pieces = splitter.split_documents([doc])
+                yield from pieces
+                continue
+            pending.append(doc)
+            pending_tokens += tokens
+        if pending:
+            yield _packed_document(pending)
+    finally:
+        stopwatch.record()
+
+# --- Hierarchical (Tree) Reduce ---
+def _merge(llm, partials, prompt=reduce_prompt_template):
+    if len(partials) == 1:
+        return partials[0]
+    chain = load_summarize_chain(llm, chain_type="stuff", prompt=prompt)
+    with timed("reduce_merge"):
+        return chain.run([Document(page_content="\n\n".join(partials))])
+
+def reduce_input_budget():
+    """Tokens of partial summaries that fit in one reduce call next to its prompt and output"""
+    return config.MODEL_CONTEXT_TOKENS - config.REDUCE_PROMPT_TOKENS - config.REDUCE_OUTPUT_TOKENS
+
+def group_by_budget(texts, budget):
+    """Pack consecutive texts into groups whose combined size stays under budget.
+
+    Every group but the last holds at least two texts, so each reduce level
+    shrinks; a trailing single text stays on its own rather than pushing the
+    previous group over budget.
+    """
+    groups, current, size = [], [], 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if len(current) >= 2 and size + tokens > budget:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def reduce_levels(llm, partials, max_workers=None):
+    """Reduce summaries in a tree until one remains.
+
+    Returns every level: levels[0] are the chunk summaries, the middle levels
+    are section summaries and levels[-1] holds the single document summary.
+    Each reduce call only sees a group that fits the model's context window.
+    """
+    levels = [list(partials)]
+    if not partials:
+        return levels
+    if not config.HIERARCHICAL_SUMMARY:
+        levels.append([_merge(llm, partials)])
+        return levels
+    max_workers = max(1, max_workers or config.SUMMARY_CONCURRENCY)
+    while len(levels[-1]) > 1:
+        groups = group_by_budget(levels[-1], reduce_input_budget())
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as pool:
+            levels.append(list(pool.map(lambda group: _merge(llm, group), groups)))
+    return levels
+
+# --- Streaming ---
+_DONE = object()
+
+class SummaryStream:
+    """Iterate over summary tokens chunk by chunk, in document order.
+
+    `docs` may be a lazy iterable: chunks are submitted to a bounded pool as
+    they arrive, at most max_workers at a time so a long document is not read
+    ahead of the LLM calls, tokens of the first chunk are yielded as they stream in while
+    later chunks buffer. With streaming off (STREAM_SUMMARIES=0) each chunk
+    is one non-streaming call and arrives as a single piece. `submitted`
+    counts the chunks handed to the pool so far and `reading` stays true
+    until the last one is. Once exhausted, `partials` holds the per-chunk
+    summaries for the reduce pass.
+    """
+
+    def __init__(self, llm, docs, prompt=map_prompt_template, max_workers=None, streaming=None):
+        self.llm = llm
+        self.streaming = config.STREAM_SUMMARIES if streaming is None else streaming
+        self.docs = docs
+        self.prompt = prompt
+        self.max_workers = max(1, max_workers or config.SUMMARY_CONCURRENCY)
+        self.partials = []
+        self.submitted = 0
+        self.reading = True
+        self._slots = threading.Semaphore(self.max_workers)
+        self._stopped = False
+
+    @timed("map_chunk")
+    def _stream_chunk(self, doc, tokens):
+        try:
+            prompt = self.prompt.format(text=doc.page_content)
+            pieces = self.llm.stream(prompt) if self.streaming else [self.llm.invoke(prompt)]
+            for piece in pieces:
+                tokens.put(piece.content if hasattr(piece, 'content') else str(piece))
+        except Exception as e:
+            tokens.put(e)
+        finally:
+            self._slots.release()
+            tokens.put(_DONE)
+
+    def _submit_all(self, pool, chunks):
+        try:
+            for doc in self.docs:
+                # Wait for a running chunk to finish before reading further into the document
+                while not self._slots.acquire(timeout=0.5):
+                    if self._stopped:
+                        return
+                if self._stopped:
+                    return
+                tokens = queue.Queue()
+                chunks.put(tokens)
+                pool.submit(self._stream_chunk, doc, tokens)
+                self.submitted += 1
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            self.reading = False
+            chunks.put(_DONE)
+
+    def __iter__(self):
+        chunks = queue.Queue()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            threading.Thread(target=self._submit_all, args=(pool, chunks), daemon=True).start()
+            try:
+                yield from self._tokens(pool, chunks)
+            finally:
+                self._stopped = True  # lets the reader thread exit if the consumer stops early
+
+    def _tokens(self, pool, chunks):
+        i = 0
+        while (tokens := chunks.get()) is not _DONE:
+            if isinstance(tokens, Exception):
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise tokens
+            if i:
+                yield "\n\n"
+            i += 1
+            parts = []
+            while (token := tokens.get()) is not _DONE:
+                if isinstance(token, Exception):
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise token
+                parts.append(token)
+                yield token
+            self.partials.append("".join(parts))
@@ -0,0 +1,79 @@
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import config
+
+# --- Index Keys ---
+def url_index_key(url):
+    """Source chunks do not depend on role or language, so one index serves every summary of a source"""
+    return hashlib.sha256(f"url\0{url.strip()}".encode("utf-8")).hexdigest()
+
+def pdf_index_key(digest, pages):
+    return hashlib.sha256(f"pdf\0{digest}\0{pages.start}\0{pages.stop}".encode("utf-8")).hexdigest()
+
+def _index_dir(key):
+    return os.path.join(config.RAG_INDEX_DIR, key)
+
+def has_index(key):
+    return os.path.exists(os.path.join(_index_dir(key), "chunks.json"))
+
+# --- Embeddings ---
+@functools.lru_cache(maxsize=1)
+def _embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(config.EMBEDDING_MODEL)
+
+def embed(texts):
+    """Unit-length float32 embeddings, so inner product equals cosine similarity"""
+    return _embedder().encode(list(texts), batch_size=64, normalize_embeddings=True,
+                              convert_to_numpy=True).astype("float32")
+
+# --- Building ---
+def split_for_retrieval(documents):
+    """Small overlapping chunks sized for the embedding model, in document order"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from pipeline import count_tokens
+    splitter = RecursiveCharacterTextSplitter(chunk_size=config.RAG_CHUNK_TOKENS,
+                                              chunk_overlap=config.RAG_CHUNK_OVERLAP_TOKENS,
+                                              length_function=count_tokens)
+    return [doc.page_content for doc in splitter.split_documents(documents) if doc.page_content.strip()]
+
+def build_index(key, documents):
+    """Embed the source documents once and persist a FAISS index plus the chunk texts under key"""
+    import faiss
+    chunks = split_for_retrieval(documents)
+    if not chunks:
+        return
+    vectors = embed(chunks)
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    # Write into a temp dir and rename, so readers never see a half-written index
+    os.makedirs(config.RAG_INDEX_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=config.RAG_INDEX_DIR)
+    faiss.write_index(index, os.path.join(tmp_dir, "index.faiss"))
+    with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump(chunks, f, ensure_ascii=False)
+    try:
+        os.rename(tmp_dir, _index_dir(key))
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)  # another job built it first
+
+# --- Retrieval ---
+@functools.lru_cache(maxsize=32)
+def _load(key):
+    import faiss
+    index = faiss.read_index(os.path.join(_index_dir(key), "index.faiss"))
+    with open(os.path.join(_index_dir(key), "chunks.json"), encoding="utf-8") as f:
+        chunks = json.load(f)
+    return index, chunks
+
+def retrieve(key, question, k=None):
+    """The k source chunks most similar to question, in document order"""
+    index, chunks = _load(key)
+    k = min(k or config.RAG_TOP_K, len(chunks))
+    _, ids = index.search(embed([question]), k)
+    return [chunks[i] for i in sorted(i for i in ids[0] if i >= 0)]
@@ -0,0 +1,166 @@
+"""Collapse identical concurrent calls into one.
+
+The first caller for a key runs the call; callers arriving while it is in
+flight wait and receive the same result (or exception). Streams are shared
+too: followers replay the chunks produced so far and then follow the live
+call; if the leader stops reading early, followers get AbandonedStream
+rather than a truncated answer. Nothing is kept once the call finishes;
+that is the caches' job.
+"""
+import json
+import os
+import threading
+import time
+
+import config
+from metrics import metrics
+
+class AbandonedStream(RuntimeError):
+    """The shared stream's leader stopped reading, so followers only saw part of it"""
+
+class _Flight:
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def publish(self, item):
+        with self.cond:
+            self.items.append(item)
+            self.cond.notify_all()
+
+    def finish(self, error=None):
+        with self.cond:
+            self.done, self.error = True, error
+            self.cond.notify_all()
+
+    def replay(self):
+        index = 0
+        while True:
+            with self.cond:
+                while index == len(self.items) and not self.done:
+                    self.cond.wait()
+                if index == len(self.items):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                item = self.items[index]
+            index += 1
+            yield item
+
+# --- In-Process ---
+class SingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.shared_calls = 0  # calls answered by another caller's request
+
+    def _join(self, key):
+        """(flight, is_leader) for key"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.shared_calls += 1
+                metrics.count("singleflight_shared_total")
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _leave(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key, fn):
+        """fn() once for all concurrent callers with the same key"""
+        flight, leader = self._join(key)
+        if not leader:
+            return next(flight.replay())
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.finish(e)
+            raise
+        finally:
+            self._leave(key, flight)
+        flight.publish(result)
+        flight.finish()
+        return result
+
+    def stream(self, key, fn):
+        """Iterate fn() once for all concurrent callers with the same key"""
+        flight, leader = self._join(key)
+        if not leader:
+            yield from flight.replay()
+            return
+        try:
+            for item in fn():
+                flight.publish(item)
+                yield item
+        except GeneratorExit:
+            # Followers must not take a cut-off stream for a complete answer
+            flight.finish(AbandonedStream(f"The shared call was abandoned after {len(flight.items)} chunks"))
+            raise
+        except BaseException as e:
+            flight.finish(e)
+            raise
+        else:
+            flight.finish()
+        finally:
+            self._leave(key, flight)
+
+single_flight = SingleFlight()
+
+# --- Cross-Process ---
+def _prune(directory, fcntl):
+    """Remove expired results, and lock files nobody has used for an hour"""
+    now = time.time()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            age = now - os.path.getmtime(path)
+            if name.endswith(".lock"):
+                if age < 3600:
+                    continue
+                with open(path, "a") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os.remove(path)
+            elif age > config.SINGLE_FLIGHT_RESULT_TTL:
+                os.remove(path)
+        except OSError:
+            pass
+
+def file_flight(key, fn):
+    """fn() once across processes sharing SINGLE_FLIGHT_DIR; fn must return JSON-serializable data.
+
+    The leader holds an exclusive lock on <key>.lock while calling; processes
+    waiting on the lock then read the result it left in <key>.json. Falls
+    back to calling fn() directly where file locks are unavailable.
+    """
+    directory = config.SINGLE_FLIGHT_DIR
+    try:
+        import fcntl
+    except ImportError:
+        return fn()
+    os.makedirs(directory, exist_ok=True)
+    result_path = os.path.join(directory, f"{key}.json")
+    with open(os.path.join(directory, f"{key}.lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        os.utime(lock_file.fileno())  # in use; see _prune
+        try:
+            try:
+                if time.time() - os.path.getmtime(result_path) < config.SINGLE_FLIGHT_RESULT_TTL:
+                    with open(result_path, encoding="utf-8") as f:
+                        return json.load(f)
+            except (OSError, ValueError):
+                pass
+            result = fn()
+            tmp_path = f"{result_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, result_path)
+            _prune(directory, fcntl)
+            return result
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
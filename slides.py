@@ -0,0 +1,195 @@
+"""PowerPoint decks from summaries.
+
+The LLM writes a plain-text slide outline, which is parsed into slide specs
+and poured into a themed template (SLIDE_TEMPLATE_PATH, or a built-in
+theme). The template is loaded once per process. Decks are stored per
+summary and language in the artifact store, so only the first download of
+a deck costs an LLM call. Nothing here touches Streamlit, so decks can be
+built on the job manager's worker threads.
+"""
+import functools
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from metrics import timed
+
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+SLIDES_PROMPT = """Transform this content into a professional PowerPoint presentation with 6-7 slides:
+{summary}
+
+Rules:
+1. Create 6-7 slides covering key aspects
+2. Don't copy exact text - rephrase for presentation
+3. Include:
+   - Title slide with topic
+   - Introduction/Overview
+   - 3-4 key points (1 slide each)
+   - Case study/example (if applicable)
+   - Conclusion slide
+4. For each slide provide:
+   - Slide title
+   - 3-5 concise bullet points
+   - Suggested visual theme (chart/diagram/image)
+
+Format exactly like this:
+Slide 1: [Title] | [Theme]
+- Content point 1
+- Content point 2
+
+Slide 2: [Title] | [Theme]
+- Content point 1
+- Content point 2"""
+
+# --- Slide Specs ---
+SLIDE_HEADER = re.compile(r"^\**\s*slide\s*\d+\s*[:.\-]\s*(.*)$", re.IGNORECASE)
+
+def _clean(text):
+    return text.strip().strip("*").strip().strip("[]").strip()
+
+def parse_slide_specs(outline):
+    """[{"title", "visual", "bullets"}] from the 'Slide N: Title | Theme' / '- point' outline"""
+    specs = []
+    for line in outline.splitlines():
+        line = line.strip()
+        header = SLIDE_HEADER.match(line)
+        if header:
+            title, _, visual = header.group(1).partition("|")
+            specs.append({"title": _clean(title) or f"Slide {len(specs) + 1}", "visual": _clean(visual),
+                          "bullets": []})
+        elif specs and line[:1] in ("-", "*", "•") and _clean(line[1:]):
+            specs[-1]["bullets"].append(_clean(line[1:]))
+    return specs
+
+# --- Template ---
+THEME = {"dark": (0, 32, 96), "light": (227, 239, 255)}
+
+def _default_template():
+    """A 16:9 deck whose title and content layouts carry the app's colors"""
+    from pptx import Presentation
+    from pptx.dml.color import RGBColor
+    from pptx.util import Inches
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Inches(13.333), Inches(7.5)
+    for layout, background in ((prs.slide_layouts[0], "dark"), (prs.slide_layouts[1], "light")):
+        fill = layout.background.fill
+        fill.solid()
+        fill.fore_color.rgb = RGBColor(*THEME[background])
+        for shape in layout.placeholders:
+            # Placeholders were positioned for 4:3; stretch them to the wider slide
+            shape.left = int(shape.left * 13.333 / 10)
+            shape.width = int(shape.width * 13.333 / 10)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+@functools.lru_cache(maxsize=1)
+def template_bytes():
+    path = config.SLIDE_TEMPLATE_PATH
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    return _default_template()
+
+# --- Rendering ---
+def _style_title(shape, color):
+    from pptx.dml.color import RGBColor
+    for paragraph in shape.text_frame.paragraphs:
+        for run in paragraph.runs:
+            run.font.bold = True
+            if not config.SLIDE_TEMPLATE_PATH:
+                run.font.color.rgb = RGBColor(*color)
+
+@timed("build_deck")
+def build_deck(specs, subtitle="Smart Summarizer"):
+    """Render slide specs into .pptx bytes: the first spec becomes the title slide"""
+    from pptx import Presentation
+    from pptx.util import Pt
+    if not specs:
+        raise ValueError("The slide outline had no slides")
+    prs = Presentation(io.BytesIO(template_bytes()))
+    title_layout, content_layout = prs.slide_layouts[0], prs.slide_layouts[1]
+
+    first, rest = specs[0], specs[1:]
+    slide = prs.slides.add_slide(title_layout)
+    slide.shapes.title.text = first["title"]
+    _style_title(slide.shapes.title, (255, 255, 255))
+    if len(slide.placeholders) > 1:
+        slide.placeholders[1].text = " · ".join(first["bullets"][:2]) or subtitle
+
+    for spec in rest:
+        slide = prs.slides.add_slide(content_layout)
+        slide.shapes.title.text = spec["title"]
+        _style_title(slide.shapes.title, THEME["dark"])
+        body = slide.placeholders[1].text_frame
+        for i, bullet in enumerate(spec["bullets"] or [spec["title"]]):
+            paragraph = body.paragraphs[0] if i == 0 else body.add_paragraph()
+            paragraph.text = bullet
+            paragraph.font.size = Pt(24)
+        if spec["visual"]:
+            slide.notes_slide.notes_text_frame.text = f"Suggested visual: {spec['visual']}"
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+# --- Cached Decks ---
+def deck_for_summary(llm, artifact_store, summary_id, summary_text, lang="en", regenerate=False, progress=None):
+    """The summary's deck as .pptx bytes, built and stored on first use"""
+    if not regenerate:
+        deck = artifact_store.get(summary_id, "deck", lang)
+        if deck is not None:
+            return deck
+    outline = None if regenerate else artifact_store.get(summary_id, "slides", lang)
+    if outline is None:
+        if progress:
+            progress.update(0.1, "Writing the slide outline")
+        response = llm.invoke(SLIDES_PROMPT.format(summary=summary_text))
+        outline = response.content if hasattr(response, 'content') else str(response)
+        artifact_store.put(summary_id, "slides", lang, outline)
+    if progress:
+        progress.update(0.9, "Building the slides")
+    deck = build_deck(parse_slide_specs(outline))
+    artifact_store.put(summary_id, "deck", lang, deck)
+    return deck
+
+def deck_file_name(source_value, summary_id):
+    stem = re.sub(r"[^A-Za-z0-9]+", "_", os.path.basename(str(source_value).rstrip("/")))[:60].strip("_")
+    return f"{summary_id}_{stem or 'summary'}.pptx"
+
+def export_decks(llm, artifact_store, history_store, items, lang="en", progress=None, max_workers=None):
+    """Zip the decks of many summaries; items are history entries with "id" and "source_value".
+
+    Cached decks are reused; missing ones are built concurrently. A summary
+    whose deck fails is listed in errors.txt inside the zip instead of
+    failing the export.
+    """
+    items = list(items)
+    if not items:
+        raise ValueError("There are no summaries to export")
+    done, errors = [0], []
+
+    def build(item):
+        try:
+            text = history_store.get(item["id"]) or ""
+            return item, deck_for_summary(llm, artifact_store, item["id"], text, lang)
+        except Exception as e:
+            errors.append(f"{item['source_value']}: {e}")
+            return item, None
+        finally:
+            done[0] += 1
+            if progress:
+                progress.update(done[0] / len(items), f"Built {done[0]} of {len(items)} decks")
+
+    buffer = io.BytesIO()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers or config.SLIDE_WORKERS, len(items)))) as pool, \
+            zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for item, deck in pool.map(build, items):
+            if deck is not None:
+                archive.writestr(deck_file_name(item["source_value"], item["id"]), deck)
+        if errors:
+            archive.writestr("errors.txt", "\n".join(errors))
+    return buffer.getvalue()
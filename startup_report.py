@@ -0,0 +1,101 @@
+"""Measure cold-start import cost of the app.
+
+Usage: python startup_report.py [--top N]
+
+Each module is imported in a fresh interpreter so the numbers reflect what a
+new Streamlit worker pays. Modules imported at the top of final.py make up the
+startup path (role and login pages) and are checked against
+STARTUP_IMPORT_BUDGET; everything else is loaded lazily on first use.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+import config
+
+# Loaded the first time the feature that needs them is used
+LAZY_MODULES = {
+    "pipeline": "summarization",
+    "langchain_groq": "summarization",
+    "deep_translator": "translation cache miss",
+    "mysql.connector": "MySQL history backend",
+    "graphviz": "mindmap",
+    "gtts": "audio summary",
+    "pptx": "slides",
+    "fpdf": "PDF export",
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def startup_modules(path=None):
+    """Modules imported at the top of final.py, paid on every cold start"""
+    with open(path or os.path.join(HERE, "final.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        modules += [name for name in names if name not in modules]
+    return modules
+
+def _run_importtime(statement):
+    """Run `statement` in a fresh interpreter and return {module: (cumulative seconds, nesting depth)}"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=HERE, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else statement)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        times[name.strip()] = (int(cumulative) / 1e6, depth)
+    return times
+
+def measure(module):
+    """Cold import time of one module in seconds, or None if it is not installed"""
+    try:
+        return _run_importtime(f"import {module}").get(module, (None, 0))[0]
+    except RuntimeError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=10, help="slowest startup modules to list")
+    args = parser.parse_args()
+
+    print("Startup path (role/login pages)")
+    modules = startup_modules()
+    startup_times = _run_importtime("import " + ", ".join(modules))
+    total = 0.0
+    for module in modules:
+        seconds = startup_times.get(module, (0.0, 0))[0]
+        total += seconds
+        print(f"  {module:<20} {seconds * 1000:8.1f} ms")
+    print(f"  {'total':<20} {total * 1000:8.1f} ms  (budget {config.STARTUP_IMPORT_BUDGET * 1000:.0f} ms)")
+
+    top_level = {name: t for name, (t, depth) in startup_times.items() if depth <= 1}
+    print("\nSlowest direct dependencies on the startup path")
+    for name, seconds in sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {name:<30} {seconds * 1000:8.1f} ms")
+
+    print("\nLazy modules (cold, paid on first use)")
+    for module, feature in LAZY_MODULES.items():
+        seconds = measure(module)
+        cost = "not installed" if seconds is None else f"{seconds * 1000:8.1f} ms"
+        print(f"  {module:<20} {cost:>13}  {feature}")
+
+    if total > config.STARTUP_IMPORT_BUDGET:
+        print(f"\nStartup imports exceed the budget by {(total - config.STARTUP_IMPORT_BUDGET) * 1000:.0f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
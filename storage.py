@@ -0,0 +1,253 @@
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import config
+from metrics import timed
+
+def _page(rows, limit):
+    """Trim the look-ahead row and build the keyset cursor for the next page"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1]["timestamp"], rows[-1]["id"])
+
+def _search_terms(query):
+    return re.findall(r"\w+", query.lower())
+
+def _fts5_query(query):
+    """Turn free text into a safe FTS5 query: every word must match, the last one as a prefix"""
+    terms = _search_terms(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def _snippet(text, query, width=160):
+    """Excerpt of text around the first search hit, with the matched words in bold"""
+    terms = _search_terms(query)
+    lowered = text.lower()
+    hits = [lowered.find(term) for term in terms if term in lowered]
+    start = max(0, min(hits) - width // 3) if hits else 0
+    excerpt = text[start:start + width].replace("\n", " ")
+    for term in terms:
+        excerpt = re.sub(rf"(\w*{re.escape(term)}\w*)", r"**\1**", excerpt, flags=re.IGNORECASE)
+    return ("…" if start else "") + excerpt + ("…" if start + width < len(text) else "")
+
+# --- MySQL Backend ---
+class MySQLHistoryStore:
+    """Summary history in MySQL, served from a connection pool"""
+
+    def __init__(self, pool_size=None):
+        from mysql.connector import pooling
+        pool_size = pool_size or config.MYSQL_POOL_SIZE
+        # get_connection() fails at once when the pool is empty; callers queue here instead
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name="summary_history",
+            pool_size=pool_size,
+            host=config.MYSQL_HOST,
+            user=config.MYSQL_USER,
+            password=config.MYSQL_PASSWORD,
+            database=config.MYSQL_DATABASE,
+        )
+        self._ensure_index("CREATE INDEX idx_summaries_user_ts ON summaries (user_key, timestamp, id)")
+        self._ensure_index("ALTER TABLE summaries ADD FULLTEXT INDEX ft_summaries (source_value, summary)")
+
+    def _ensure_index(self, statement):
+        from mysql.connector import errorcode, Error
+        try:
+            with self._cursor() as cursor:
+                cursor.execute(statement)
+        except Error as e:
+            if e.errno != errorcode.ER_DUP_KEYNAME:
+                raise
+
+    @contextmanager
+    def _cursor(self, dictionary=False):
+        with timed("history_pool_wait"):
+            acquired = self._slots.acquire(timeout=config.MYSQL_POOL_TIMEOUT)
+        if not acquired:
+            raise RuntimeError("The summary history database is busy. Please try again.")
+        try:
+            conn = self._pool.get_connection()
+            try:
+                cursor = conn.cursor(dictionary=dictionary)
+                try:
+                    yield cursor
+                    conn.commit()
+                finally:
+                    cursor.close()
+            finally:
+                conn.close()  # returns the connection to the pool
+        finally:
+            self._slots.release()
+
+    @timed("history_save")
+    def save(self, user_key, source_type, source_value, summary):
+        with self._cursor() as cursor:
+            cursor.execute("INSERT INTO summaries (user_key, source_type, source_value, summary) VALUES (%s, %s, %s, %s)",
+                           (user_key, source_type, source_value, summary))
+            return cursor.lastrowid
+
+    @timed("history_page")
+    def history_page(self, user_key, limit, before=None):
+        """Return (rows, next_cursor) of summary metadata, newest first, after the (timestamp, id) cursor"""
+        with self._cursor(dictionary=True) as cursor:
+            if before is None:
+                cursor.execute("SELECT id, source_type, source_value, timestamp FROM summaries WHERE user_key = %s "
+                               "ORDER BY timestamp DESC, id DESC LIMIT %s", (user_key, limit + 1))
+            else:
+                cursor.execute("SELECT id, source_type, source_value, timestamp FROM summaries WHERE user_key = %s "
+                               "AND (timestamp < %s OR (timestamp = %s AND id < %s)) "
+                               "ORDER BY timestamp DESC, id DESC LIMIT %s",
+                               (user_key, before[0], before[0], before[1], limit + 1))
+            return _page(cursor.fetchall(), limit)
+
+    @timed("history_search")
+    def search(self, user_key, query, limit):
+        """Rank the user's summaries against query with the FULLTEXT index"""
+        if not _search_terms(query):
+            return []
+        with self._cursor(dictionary=True) as cursor:
+            cursor.execute("SELECT id, source_type, source_value, timestamp, summary, "
+                           "MATCH (source_value, summary) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score "
+                           "FROM summaries WHERE user_key = %s AND MATCH (source_value, summary) AGAINST (%s IN NATURAL LANGUAGE MODE) "
+                           "ORDER BY score DESC LIMIT %s", (query, user_key, query, limit))
+            rows = cursor.fetchall()
+        for row in rows:
+            row["snippet"] = _snippet(row.pop("summary") or "", query)
+            row.pop("score", None)
+        return rows
+
+    @timed("history_get")
+    def get(self, summary_id):
+        with self._cursor() as cursor:
+            cursor.execute("SELECT summary FROM summaries WHERE id = %s", (summary_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    @timed("history_delete")
+    def delete(self, summary_id):
+        with self._cursor() as cursor:
+            cursor.execute("DELETE FROM summaries WHERE id = %s", (summary_id,))
+
+# --- SQLite Backend ---
+class SQLiteHistoryStore:
+    """Summary history in a local SQLite file (WAL mode), one connection per thread"""
+
+    def __init__(self, path=None):
+        self.path = path or config.SQLITE_HISTORY_PATH
+        self._local = threading.local()
+        with self._cursor() as cursor:
+            # Same layout as the bundled summaries.db; the user key lives in `email`
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT,
+                source_type TEXT,
+                source_value TEXT,
+                summary TEXT,
+                timestamp TEXT
+            )""")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_summaries_user_ts ON summaries (email, timestamp, id)")
+            # Full-text index over the summaries table, kept in sync by triggers
+            has_fts = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'summaries_fts'").fetchone()
+            cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS summaries_fts USING fts5(
+                source_value, summary, content='summaries', content_rowid='id'
+            )""")
+            cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS summaries_fts_insert AFTER INSERT ON summaries BEGIN
+                INSERT INTO summaries_fts (rowid, source_value, summary) VALUES (new.id, new.source_value, new.summary);
+            END""")
+            cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS summaries_fts_delete AFTER DELETE ON summaries BEGIN
+                INSERT INTO summaries_fts (summaries_fts, rowid, source_value, summary) VALUES ('delete', old.id, old.source_value, old.summary);
+            END""")
+            if not has_fts:
+                cursor.execute("INSERT INTO summaries_fts (summaries_fts) VALUES ('rebuild')")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _cursor(self):
+        conn = self._connection()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    @timed("history_save")
+    def save(self, user_key, source_type, source_value, summary):
+        with self._cursor() as cursor:
+            cursor.execute("INSERT INTO summaries (email, source_type, source_value, summary, timestamp) VALUES (?, ?, ?, ?, datetime('now'))",
+                           (user_key, source_type, source_value, summary))
+            return cursor.lastrowid
+
+    @timed("history_page")
+    def history_page(self, user_key, limit, before=None):
+        """Return (rows, next_cursor) of summary metadata, newest first, after the (timestamp, id) cursor"""
+        with self._cursor() as cursor:
+            if before is None:
+                cursor.execute("SELECT id, source_type, source_value, timestamp FROM summaries WHERE email = ? "
+                               "ORDER BY timestamp DESC, id DESC LIMIT ?", (user_key, limit + 1))
+            else:
+                cursor.execute("SELECT id, source_type, source_value, timestamp FROM summaries WHERE email = ? "
+                               "AND (timestamp < ? OR (timestamp = ? AND id < ?)) "
+                               "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                               (user_key, before[0], before[0], before[1], limit + 1))
+            return _page([dict(row) for row in cursor.fetchall()], limit)
+
+    @timed("history_search")
+    def search(self, user_key, query, limit):
+        """Rank the user's summaries against query with the FTS5 index (bm25)"""
+        match = _fts5_query(query)
+        if match is None:
+            return []
+        with self._cursor() as cursor:
+            cursor.execute("SELECT s.id, s.source_type, s.source_value, s.timestamp, "
+                           "snippet(summaries_fts, 1, '**', '**', '…', 24) AS snippet "
+                           "FROM summaries_fts JOIN summaries s ON s.id = summaries_fts.rowid "
+                           "WHERE summaries_fts MATCH ? AND s.email = ? "
+                           "ORDER BY bm25(summaries_fts) LIMIT ?", (match, user_key, limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+    @timed("history_get")
+    def get(self, summary_id):
+        with self._cursor() as cursor:
+            cursor.execute("SELECT summary FROM summaries WHERE id = ?", (summary_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    @timed("history_delete")
+    def delete(self, summary_id):
+        with self._cursor() as cursor:
+            cursor.execute("DELETE FROM summaries WHERE id = ?", (summary_id,))
+
+HISTORY_BACKENDS = {
+    "mysql": MySQLHistoryStore,
+    "sqlite": SQLiteHistoryStore,
+}
+
+def create_history_store(backend=None):
+    """Create the history store selected by HISTORY_BACKEND"""
+    backend = (backend or config.HISTORY_BACKEND).lower()
+    if backend not in HISTORY_BACKENDS:
+        raise ValueError(f"Unknown history backend: {backend}")
+    return HISTORY_BACKENDS[backend]()
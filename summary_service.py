@@ -0,0 +1,151 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import rag
+from metrics import metrics, timed
+from cache import summary_cache_key, url_cache_key, pdf_cache_key, pdf_digest, documents_text
+from translation import translate_markdown
+
+# --- Text Cleaning Utilities ---
+def clean_text(text):
+    """Clean text of problematic unicode characters"""
+    replacements = {
+        '\u2013': '-',  # en dash
+        '\u2014': '-',  # em dash
+        '\u2018': "'",  # left single quote
+        '\u2019': "'",  # right single quote
+        '\u201c': '"',  # left double quote
+        '\u201d': '"',  # right double quote
+    }
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+    return text
+
+# --- Progress Reporting ---
+class Progress:
+    """Receives progress from summarize_source; the default implementation ignores it"""
+
+    def update(self, fraction, message):
+        pass
+
+    def token(self, text):
+        pass
+
+# --- Chat Index ---
+# One thread: embedding is CPU-bound, and indexes are built one after another
+_indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-index")
+
+def index_for_chat(index_key, load_documents, artifact_store, summary_id):
+    """Build the summary's chat index in the background; chat answers from the summary until it is ready"""
+    def build():
+        try:
+            if not rag.has_index(index_key):
+                with timed("rag_index"):
+                    rag.build_index(index_key, load_documents())
+            artifact_store.put(summary_id, "rag_index", "", index_key)
+        except Exception:
+            metrics.count("rag_index_failures_total")
+            raise
+    return _indexer.submit(build)
+
+# --- Summarization ---
+def _collect(documents, into):
+    """Pass documents through lazily while keeping a copy for later use"""
+    for doc in documents:
+        into.append(doc)
+        yield doc
+
+def _summarize(llm, documents, cache_key, target_lang, summary_cache, progress):
+    """Summarize, clean and translate documents unless a summary of the same content is cached.
+
+    Returns (summary, levels); levels is the untranslated summary tree, or None on a cache hit.
+    """
+    from pipeline import SummaryStream, iter_split_documents, reduce_levels
+    summary = summary_cache.get(cache_key)
+    if summary is not None:
+        return summary, None
+    progress.update(0.1, "Summarizing")
+    stream = SummaryStream(llm, iter_split_documents(documents))
+    done, fraction = 0, 0.1
+    with timed("map_phase"):
+        for token in stream:
+            progress.token(token)
+            if len(stream.partials) != done:
+                done = len(stream.partials)
+                # Chunks are submitted while the document is still read, so keep room for more until it ends
+                total = stream.submitted + stream.reading
+                fraction = max(fraction, 0.1 + 0.7 * done / total)
+                progress.update(fraction, f"Summarized {done} of {stream.submitted}{'+' if stream.reading else ''} chunks")
+    if not stream.partials:
+        # Scanned PDFs, empty page ranges and blank pages; nothing worth caching or saving
+        raise ValueError("No text could be extracted from the document.")
+    progress.update(0.8, f"Merging {len(stream.partials)} chunk summaries")
+    with timed("reduce_phase"):
+        levels = reduce_levels(llm, stream.partials)
+    summary = clean_text(levels[-1][0])  # Clean text before translation
+    if target_lang != "en":
+        progress.update(0.9, "Translating")
+    summary = translate_markdown(summary, target_lang)
+    summary_cache.put(cache_key, summary)
+    return summary, levels
+
+@timed("summarize_source")
+def summarize_source(request, llm, summary_cache, history_store, artifact_store, progress=None):
+    """Load, summarize and save one source; shared by the app's background jobs and the batch CLI.
+
+    request keys: source_type ("url" or "pdf"), source (URL, PDF path or PDF bytes),
+    user_key, role, target_lang, and for PDFs optional name and pages ("3-10").
+    Returns {"summary_id", "summary", "source_value", "cached"}.
+    """
+    from pipeline import load_url, load_pdf_pages
+    from pdf_ingest import parse_page_range, page_count
+    progress = progress or Progress()
+    role, target_lang = request.get("role"), request.get("target_lang", "en")
+    source_type, source = request["source_type"], request["source"]
+    levels = None
+    loaded = []  # source documents read during this run, reused for the chat index
+    progress.update(0.0, "Loading")
+    if source_type == "url":
+        source_value = source
+        index_key = rag.url_index_key(source)
+        load_documents = lambda: load_url(source)
+        url_key = url_cache_key(source, role, target_lang)
+        summary = summary_cache.get(url_key)
+        if summary is None:
+            documents = load_url(source)
+            loaded = documents
+            if not documents:
+                raise ValueError("No content found at the URL.")
+            cache_key = summary_cache_key(documents_text(documents), role, target_lang)
+            summary, levels = _summarize(llm, documents, cache_key, target_lang, summary_cache, progress)
+            summary_cache.put(url_key, summary, ttl=config.URL_CACHE_TTL)
+    elif source_type == "pdf":
+        if isinstance(source, str):
+            # Paths go to the reader as-is so the file is memory-mapped rather than read into memory
+            source_value = request.get("name") or source
+            pdf = source
+        else:
+            source_value = request.get("name") or "uploaded.pdf"
+            pdf = bytes(source)
+        # Pages are parsed straight from the file or buffer and streamed into the splitter
+        pages = parse_page_range(request.get("pages"), page_count(pdf))
+        digest = pdf_digest(pdf)
+        cache_key = pdf_cache_key(digest, pages, role, target_lang)
+        index_key = rag.pdf_index_key(digest, pages)
+        load_documents = lambda: list(load_pdf_pages(pdf, pages, name=source_value))
+        documents = _collect(load_pdf_pages(pdf, pages, name=source_value), loaded)
+        summary, levels = _summarize(llm, documents, cache_key, target_lang, summary_cache, progress)
+    else:
+        raise ValueError(f"Unknown source type: {source_type}")
+
+    progress.update(0.95, "Saving")
+    summary_id = history_store.save(request["user_key"], source_type, source_value, summary)
+    # Keep the intermediate levels of the summary tree next to the saved summary
+    if levels and len(levels) > 2:
+        artifact_store.put(summary_id, "summary_levels", "en", json.dumps(levels))
+    if config.RAG_ENABLED:
+        # The summary is ready now; embedding a long document would only delay it
+        index_for_chat(index_key, lambda: loaded or load_documents(), artifact_store, summary_id)
+    progress.update(1.0, "Done")
+    return {"summary_id": summary_id, "summary": summary, "source_value": source_value, "cached": levels is None}
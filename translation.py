@@ -0,0 +1,203 @@
+import ast
+import functools
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from metrics import timed
+
+# --- UI String Extraction ---
+def extract_ui_strings(paths):
+    """Collect the literal strings passed to translate_text() in the given source files"""
+    strings = set()
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Call) and getattr(node.func, "id", None) == "translate_text"
+                    and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+                strings.add(node.args[0].value)
+    return sorted(strings)
+
+# --- Translation Catalog ---
+class TranslationCatalog:
+    """UI translations loaded once from disk and served from memory"""
+
+    def __init__(self, path=None, sources=None):
+        self.path = path or config.TRANSLATION_CATALOG_PATH
+        self.ui_strings = set(extract_ui_strings(sources or config.TRANSLATION_SOURCES))
+        self._lock = threading.Lock()
+        self._translations = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self._translations = json.load(f)
+
+    def lookup(self, text, target_lang):
+        return self._translations.get(target_lang, {}).get(text)
+
+    def add(self, target_lang, mapping):
+        with self._lock:
+            self._translations.setdefault(target_lang, {}).update(mapping)
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._translations, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def build(self, languages):
+        """Batch-translate every UI string missing from the catalog for the given languages"""
+        for lang in languages:
+            if lang == "en":
+                continue
+            missing = [s for s in sorted(self.ui_strings) if self.lookup(s, lang) is None]
+            if not missing:
+                continue
+            from deep_translator import GoogleTranslator
+            translated = GoogleTranslator(source="en", target=lang).translate_batch(missing)
+            self.add(lang, {s: t for s, t in zip(missing, translated) if t})
+
+catalog = TranslationCatalog()
+
+# --- Translation ---
+@functools.lru_cache(maxsize=4096)
+@timed("translate_ui")
+def _live_translate(text, target_lang):
+    from deep_translator import GoogleTranslator
+    return GoogleTranslator(source='auto', target=target_lang).translate(text)
+
+def translate_text(text, target_lang):
+    if target_lang == "en":
+        return text
+    translated = catalog.lookup(text, target_lang)
+    if translated is not None:
+        return translated
+    try:
+        translated = _live_translate(text, target_lang)
+    except:
+        return text
+    # Only static UI labels are persisted; dynamic messages stay in the in-memory cache
+    if translated and text in catalog.ui_strings:
+        catalog.add(target_lang, {text: translated})
+    return translated or text
+
+# --- Long Text Translation ---
+# Unicode blocks of the non-Latin scripts in LANGUAGE_MAP
+SCRIPT_RANGES = {
+    "hi": ("\u0900", "\u097f"),  # Devanagari
+    "te": ("\u0c00", "\u0c7f"),  # Telugu
+    "ta": ("\u0b80", "\u0bff"),  # Tamil
+    "kn": ("\u0c80", "\u0cff"),  # Kannada
+}
+
+# How an oversized block is broken up, coarsest first: at line breaks, sentence ends, then between words
+BLOCK_SPLITTERS = ((re.compile(r"\n"), "\n"), (re.compile(r"(?<=[.!?])\s+"), " "), (re.compile(r"\s+"), " "))
+
+def _split_long_block(block, max_chars, level=0):
+    """Split an oversized block into (piece, separator) pairs; only a single overlong word is hard-wrapped.
+
+    The separator is the text that stood between a piece and the next one;
+    the last piece gets None and the caller supplies the block separator.
+    """
+    if len(block) <= max_chars:
+        return [(block, None)]
+    if level == len(BLOCK_SPLITTERS):
+        pieces = [(block[i:i + max_chars], "") for i in range(0, len(block), max_chars)]
+        pieces[-1] = (pieces[-1][0], None)
+        return pieces
+    pattern, joiner = BLOCK_SPLITTERS[level]
+    pieces, current = [], None
+    for part in pattern.split(block):
+        if len(part) > max_chars:
+            if current is not None:
+                pieces.append((current, joiner))
+                current = None
+            sub_pieces = _split_long_block(part, max_chars, level + 1)
+            pieces.extend(sub_pieces[:-1])
+            pieces.append((sub_pieces[-1][0], joiner))
+        elif current is not None and len(current) + len(joiner) + len(part) > max_chars:
+            pieces.append((current, joiner))
+            current = part
+        else:
+            current = part if current is None else current + joiner + part
+    if current is not None:
+        pieces.append((current, joiner))
+    pieces[-1] = (pieces[-1][0], None)
+    return pieces
+
+def _segment_markdown(text, max_chars):
+    """Yield (segment, separator) pairs; joining them back gives the original layout"""
+    current, size = [], 0
+    for block in re.split(r"\n\s*\n", text.strip()):
+        if not block.strip():
+            continue
+        if len(block) > max_chars:
+            if current:
+                yield "\n\n".join(current), "\n\n"
+                current, size = [], 0
+            for piece, separator in _split_long_block(block, max_chars):
+                yield piece, "\n\n" if separator is None else separator
+            continue
+        # Start a new segment at every heading so sections are translated together
+        starts_section = block.lstrip().startswith("#")
+        if current and (starts_section or size + 2 + len(block) > max_chars):
+            yield "\n\n".join(current), "\n\n"
+            current, size = [], 0
+        current.append(block)
+        size += len(block) + 2
+    if current:
+        yield "\n\n".join(current), "\n\n"
+
+def split_markdown(text, max_chars=None):
+    """Split markdown into segments under max_chars, breaking only at headings and blank lines"""
+    return [segment for segment, _ in _segment_markdown(text, max_chars or config.TRANSLATION_MAX_CHARS)]
+
+def is_language(text, target_lang):
+    """Best-effort offline check whether text is already written in target_lang"""
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return True
+    if target_lang in SCRIPT_RANGES:
+        low, high = SCRIPT_RANGES[target_lang]
+        return sum(low <= c <= high for c in letters) / len(letters) > 0.5
+    try:
+        from langdetect import detect
+        return detect(text) == target_lang
+    except Exception:
+        return False
+
+def _translate_segment(segment, target_lang):
+    if is_language(segment, target_lang):
+        return segment
+    try:
+        from deep_translator import GoogleTranslator
+        with timed("translate_call"):
+            return GoogleTranslator(source='auto', target=target_lang).translate(segment) or segment
+    except Exception:
+        return segment
+
+@timed("translate_summary")
+def translate_markdown(text, target_lang, max_workers=None):
+    """Translate a long markdown document segment by segment, in parallel, preserving its structure"""
+    if target_lang == "en" or not text:
+        return text
+    pairs = list(_segment_markdown(text, config.TRANSLATION_MAX_CHARS))
+    if not pairs:
+        return text
+    max_workers = max(1, min(max_workers or config.TRANSLATION_CONCURRENCY, len(pairs)))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        translated = list(pool.map(lambda pair: _translate_segment(pair[0], target_lang), pairs))
+    return "".join(segment + separator for segment, (_, separator) in zip(translated, pairs)).rstrip()
+
+if __name__ == "__main__":
+    catalog.build(config.LANGUAGE_MAP.values())
+    print(f"Translation catalog written to {catalog.path}")
@@ -0,0 +1,113 @@
+"""Text-to-speech for audio summaries.
+
+Scripts are split at sentence boundaries into chunks that are synthesized
+concurrently and joined in order. Backends: "gtts" (Google, needs network,
+MP3) and "espeak" (local espeak-ng/espeak binary, WAV) for offline
+deployments; pick one with TTS_BACKEND.
+"""
+import io
+import re
+import shutil
+import subprocess
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from metrics import timed
+
+# --- Sentence Chunking ---
+SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")  # । is the Devanagari full stop
+
+def split_sentences(text, max_chars=None):
+    """Pack whole sentences into chunks of up to max_chars; an overlong sentence is split at spaces"""
+    max_chars = max_chars or config.TTS_CHUNK_CHARS
+    chunks, current = [], ""
+    for sentence in SENTENCE_END.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk]
+
+# --- Backends ---
+class GTTSBackend:
+    name = "gtts"
+    mime = "audio/mp3"
+
+    def synthesize(self, text, lang, voice=None):
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        # voice is the accent's Google domain, e.g. "co.uk" or "co.in"
+        gTTS(text=text, lang=lang, tld=voice or "com", slow=False, lang_check=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    def concatenate(self, parts):
+        # MP3 frames are self-contained, so the streams can simply be joined
+        return b"".join(parts)
+
+class EspeakBackend:
+    name = "espeak"
+    mime = "audio/wav"
+
+    def __init__(self):
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.binary:
+            raise RuntimeError("TTS_BACKEND=espeak needs espeak-ng or espeak installed")
+
+    def synthesize(self, text, lang, voice=None):
+        # voice is an espeak voice such as "en+f3"; by default the language's own voice
+        result = subprocess.run([self.binary, "--stdout", "-v", voice or lang, text],
+                                capture_output=True, check=True, timeout=120)
+        return result.stdout
+
+    def concatenate(self, parts):
+        if len(parts) == 1:
+            return parts[0]
+        output = io.BytesIO()
+        with wave.open(output, "wb") as joined:
+            for i, part in enumerate(parts):
+                with wave.open(io.BytesIO(part), "rb") as chunk:
+                    if i == 0:
+                        joined.setparams(chunk.getparams())
+                    joined.writeframes(chunk.readframes(chunk.getnframes()))
+        return output.getvalue()
+
+TTS_BACKENDS = {
+    "gtts": GTTSBackend,
+    "espeak": EspeakBackend,
+}
+
+def create_tts_backend(backend=None):
+    """Create the TTS backend selected by TTS_BACKEND"""
+    backend = (backend or config.TTS_BACKEND).lower()
+    if backend not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {backend}")
+    return TTS_BACKENDS[backend]()
+
+# --- Synthesis ---
+@timed("tts")
+def synthesize(text, lang, voice=None, backend=None, max_workers=None):
+    """Speak text with the given backend; returns (audio bytes, mime type)"""
+    backend = backend or create_tts_backend()
+    chunks = split_sentences(text)
+    if not chunks:
+        raise ValueError("Nothing to read aloud")
+    max_workers = max(1, min(max_workers or config.TTS_CONCURRENCY, len(chunks)))
+
+    def speak(chunk):
+        with timed("tts_chunk"):
+            return backend.synthesize(chunk, lang, voice)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        parts = list(pool.map(speak, chunks))
+    return backend.concatenate(parts), backend.mime